@@ -1,6 +1,29 @@
 import yaml
 import os
 import logging
+from functools import lru_cache
+
+# Prefer the libyaml C bindings; fall back to the pure-Python implementation
+try:
+    from yaml import CSafeLoader as SafeLoader, CSafeDumper as SafeDumper
+except ImportError:
+    from yaml import SafeLoader, SafeDumper
+
+_MISSING = object()
+
+
+@lru_cache(maxsize=256)
+def _split_key(key):
+    """Split a dotted config key into a reusable tuple of path segments."""
+    return tuple(key.split('.'))
+
+
+# Map environment variables to pre-split config key paths
+_ENV_MAP = {
+    'ENABLE_AUDIO_PROCESSING': ('processor', 'enable_audio_processing'),
+}
+_TRUE_VALUES = frozenset(('true', '1', 'yes'))
+_FALSE_VALUES = frozenset(('false', '0', 'no'))
 
 
 class AppConfig:
@@ -9,6 +32,16 @@ class AppConfig:
         self.default_config_file = f"{os.path.dirname(__file__)}/{default_config}"
         self.config = self.load_and_merge_configs()
 
+    @property
+    def config(self):
+        return self._config
+
+    @config.setter
+    def config(self, value):
+        # Reassigning the whole config (e.g. after a settings update) invalidates cached lookups
+        self._config = value
+        self._get_cache = {}
+
     def load_and_merge_configs(self):
         # Load default config
         if not os.path.exists(self.default_config_file):
@@ -17,13 +50,13 @@ class AppConfig:
             )
 
         with open(self.default_config_file, 'r') as file:
-            default_config = yaml.safe_load(file) or {}
+            default_config = yaml.load(file, Loader=SafeLoader) or {}
 
         # Load user config if it exists
         user_config = {}
         if os.path.exists(self.user_config_file):
             with open(self.user_config_file, 'r') as file:
-                user_config = yaml.safe_load(file) or {}
+                user_config = yaml.load(file, Loader=SafeLoader) or {}
 
         # Merge configs (user_config overrides default_config)
         merged = self.merge_dicts(default_config, user_config)
@@ -35,12 +68,16 @@ class AppConfig:
 
     @staticmethod
     def merge_dicts(base, overrides):
-        """Recursively merges two dictionaries."""
-        for key, value in overrides.items():
-            if isinstance(value, dict) and key in base and isinstance(base[key], dict):
-                base[key] = AppConfig.merge_dicts(base[key], value)
-            else:
-                base[key] = value
+        """Deep-merges overrides into base in place, using an explicit stack instead of recursion."""
+        stack = [(base, overrides)]
+        while stack:
+            target, source = stack.pop()
+            for key, value in source.items():
+                existing = target.get(key)
+                if isinstance(value, dict) and isinstance(existing, dict):
+                    stack.append((existing, value))
+                else:
+                    target[key] = value
         return base
 
     @staticmethod
@@ -48,19 +85,14 @@ class AppConfig:
         """Apply environment variable overrides to config."""
         logger = logging.getLogger(__name__)
         
-        # Map environment variables to config keys
-        env_mappings = {
-            'ENABLE_AUDIO_PROCESSING': 'processor.enable_audio_processing',
-        }
-        
-        for env_var, config_key in env_mappings.items():
+        for env_var, keys in _ENV_MAP.items():
             env_value = os.environ.get(env_var)
             if env_value is not None:
                 # Convert string to boolean for boolean settings
                 lower_value = env_value.lower()
-                if lower_value in ('true', '1', 'yes'):
+                if lower_value in _TRUE_VALUES:
                     value = True
-                elif lower_value in ('false', '0', 'no'):
+                elif lower_value in _FALSE_VALUES:
                     value = False
                 else:
                     logger.warning(
@@ -70,7 +102,6 @@ class AppConfig:
                     continue
                 
                 # Set the value in config
-                keys = config_key.split('.')
                 config_section = config
                 for k in keys[:-1]:
                     config_section = config_section.setdefault(k, {})
@@ -79,25 +110,28 @@ class AppConfig:
         return config
 
     def get(self, key, default=None):
-        keys = key.split('.')
-        value = self.config
-        for k in keys:
-            value = value.get(k, default)
-            if value is None:
-                return default
-        return value
+        value = self._get_cache.get(key, _MISSING)
+        if value is _MISSING:
+            value = self.config
+            for k in _split_key(key):
+                value = value.get(k)
+                if value is None:
+                    break
+            self._get_cache[key] = value
+        return default if value is None else value
 
     def set(self, key, value):
-        keys = key.split('.')
+        keys = _split_key(key)
         config_section = self.config
         for k in keys[:-1]:
             config_section = config_section.setdefault(k, {})
         config_section[keys[-1]] = value
+        self._get_cache.clear()
 
     def save(self, filename=None):
         save_file = filename or self.user_config_file
         with open(save_file, 'w') as file:
-            yaml.safe_dump(self.config, file)
+            yaml.dump(self.config, file, Dumper=SafeDumper)
 
 
 app_config = AppConfig()
@@ -1,10 +1,30 @@
 import logging
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.util.retry import Retry
 import os
-import time
+import socket
+import orjson
+
+
+def _dumps(data) -> bytes:
+    # orjson serializes straight to bytes and handles numpy scalars
+    return orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+
+
+class KeepAliveAdapter(HTTPAdapter):
+    """HTTPAdapter whose sockets enable TCP keepalive, so idle pooled connections (e.g. between heartbeats) stay usable."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs['socket_options'] = HTTPConnection.default_socket_options + [
+            (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+        super().init_poolmanager(*args, **kwargs)
 
 
 class API():
+    JSON_HEADERS = {'Content-Type': 'application/json'}
+
     def __init__(self, timeout=10, max_retries=3):
         self.logger = logging.getLogger(__name__)
         self.timeout = timeout
@@ -16,48 +36,41 @@ class API():
             raise EnvironmentError(
                 "API_URL_BASE environment variable is not set.")
 
+        # Pooled keep-alive connections; urllib3 retries with exponential backoff,
+        # max_retries being the total number of attempts. Connection errors are
+        # retried for every method since the request never reached the server;
+        # read timeouts and gateway errors only for idempotent GET/PUT, so a
+        # POST is never sent twice
+        retry = Retry(
+            total=self.max_retries - 1,
+            backoff_factor=0.5,
+            status_forcelist=[502, 503, 504],
+            allowed_methods=['GET', 'PUT'],
+            raise_on_status=False,
+        )
+        adapter = KeepAliveAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
     def _send_request(self, method, endpoint, json_data):
         """ Helper function to send HTTP requests with retries and timeout """
         url = f"{self.api_url_base}/{endpoint}"
-        last_exception = None
-        
-        for attempt in range(self.max_retries):
-            try:
-                # Add timeout to prevent hanging indefinitely
-                response = requests.request(
-                    method, url, json=json_data, timeout=self.timeout
-                )
-
-                # Raise an error if the response status code is not 200 or 201
-                response.raise_for_status()
-
-                return response
-            except requests.exceptions.Timeout as e:
-                last_exception = e
-                self.logger.warning(
-                    f"API request timeout (attempt {attempt + 1}/{self.max_retries}) for {url}: {e}"
-                )
-                if attempt < self.max_retries - 1:
-                    # Exponential backoff before retrying
-                    time.sleep(0.5 * (2 ** attempt))
-            except requests.exceptions.ConnectionError as e:
-                last_exception = e
-                self.logger.warning(
-                    f"API connection error (attempt {attempt + 1}/{self.max_retries}) for {url}: {e}"
-                )
-                if attempt < self.max_retries - 1:
-                    # Exponential backoff before retrying
-                    time.sleep(0.5 * (2 ** attempt))
-            except requests.exceptions.RequestException as e:
-                # For other request exceptions, don't retry
-                self.logger.error(f"API request failed for {url}: {e}")
-                raise
-        
-        # All retries exhausted
-        self.logger.error(
-            f"API request failed after {self.max_retries} retries for {url}: {last_exception}"
-        )
-        raise last_exception
+        body = _dumps(json_data) if json_data is not None else None
+        try:
+            # Add timeout to prevent hanging indefinitely
+            response = self.session.request(
+                method, url, data=body, headers=self.JSON_HEADERS, timeout=self.timeout
+            )
+
+            # Raise an error if the response status code is not 200 or 201
+            response.raise_for_status()
+
+            return response
+        except requests.exceptions.RequestException as e:
+            # Any retries already happened in urllib3 (the message then reads "Max retries exceeded")
+            self.logger.error(f"API {method} request failed for {url}: {e}")
+            raise
 
     def notify_motion(self):
         # No need for try/except here since _send_request handles errors
@@ -68,31 +81,36 @@ class API():
         self._send_request('POST', 'notify/detections', {'detection': species})
 
     def create_video(self, species_video, species_audio, start_time, end_time, video_path, spectrogram_path):
-        # Fields to exclude from API payload (non-serializable or internal)
-        exclude_fields = {'best_frame'}
-        
         def clean_detection(d):
-            return {k: v for k, v in d.items() if k not in exclude_fields}
-        
+            # Drop fields that are non-serializable or internal (best_frame crop)
+            c = d.copy()
+            c.pop('best_frame', None)
+            return c
+
+        def audio_detection(d):
+            c = d.copy()
+            c['source'] = 'audio'
+            return c
+
         video_data = {
             'processor_version': '1',
-            'species': [clean_detection(sp) for sp in species_video] + [{**sp, 'source': 'audio'} for sp in species_audio],
+            'species': list(map(clean_detection, species_video)) + list(map(audio_detection, species_audio)),
             'start_time': start_time.isoformat(),
             'end_time': end_time.isoformat(),
             'video_path': video_path,
             'spectrogram_path': spectrogram_path
         }
         response = self._send_request('POST', 'videos', video_data)
-        return response.json()
+        return orjson.loads(response.content)
 
     def set_active_species(self, active_names):
         response = self._send_request('PUT', 'species/active', active_names)
-        response_data = response.json()
+        response_data = orjson.loads(response.content)
         return response_data.get('active_feeder_names')
 
     def activity_log(self, type, data, id=None):
         log_data = {'type': type, 'data': data, 'id': id}
         response = self._send_request('POST', 'activity_log', log_data)
-        response_data = response.json()
+        response_data = orjson.loads(response.content)
         # Capture the returned 'id' from the response
         return response_data.get('id')
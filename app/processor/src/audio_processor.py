@@ -3,14 +3,30 @@ import logging
 import os
 import subprocess
 import numpy as np
-import matplotlib.pyplot as plt
 import librosa
-import librosa.display
+import scipy.fft
+import scipy.signal
+from matplotlib import colormaps
+from PIL import Image
 from datetime import datetime
-from birdnetlib import Recording
+from functools import cached_property
+from birdnetlib import RecordingBuffer
 from birdnetlib.analyzer import Analyzer
 from birdnetlib.species import SpeciesList
 
+# PyAV decodes audio in-process; fall back to an ffmpeg subprocess without it
+try:
+    import av
+    AV_AVAILABLE = True
+except ImportError:
+    AV_AVAILABLE = False
+
+# 256-entry RGB lookup table for the magma colormap
+_MAGMA_LUT = (colormaps['magma'](np.linspace(0, 1, 256))[:, :3] * 255).astype(np.uint8)
+
+# Number of STFT frames transformed per block, bounds peak memory on long recordings
+_STFT_BLOCK_FRAMES = 1024
+
 
 class AudioProcessor:
     def __init__(self, lat, lon, spectrogram_px_per_sec=200):
@@ -18,31 +34,59 @@ class AudioProcessor:
         self.lon = lon
         self.spectrogram_px_per_sec = spectrogram_px_per_sec
         self.logger = logging.getLogger(__name__)
-        self.analyzer = Analyzer()
-        self.species_list = SpeciesList()
         self.sample_rate = 48000
+        self._mel_basis = None
+        self._mel_basis_key = None
+        self._window = None
 
-    def extract_audio(self, video_path):
-        temp_path = f"{os.path.splitext(video_path)[0]}_temp.wav"
+    @cached_property
+    def analyzer(self):
+        # BirdNET TFLite model is loaded on first use, not at construction
+        return Analyzer()
+
+    @cached_property
+    def species_list(self):
+        return SpeciesList()
+
+    def extract_audio(self, video_path) -> np.ndarray:
+        """Extract mono audio with an ffmpeg subprocess, streamed as raw PCM over a pipe."""
         try:
             result = subprocess.run(
-                ['ffmpeg', '-i', video_path, '-vn', '-acodec', 'pcm_s16le',
-                 '-ar', str(self.sample_rate), '-ac', '1', '-y', temp_path],
-                check=True, 
+                ['ffmpeg', '-i', video_path, '-vn', '-f', 's16le', '-acodec', 'pcm_s16le',
+                 '-ar', str(self.sample_rate), '-ac', '1', '-'],
+                check=True,
+                stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
                 timeout=300  # 5 minute timeout
             )
-            return temp_path
         except subprocess.TimeoutExpired:
             self.logger.error(f"Audio extraction timed out for {video_path}")
             raise
         except subprocess.CalledProcessError as e:
             self.logger.error(f"Audio extraction failed: {e.stderr.decode()}")
             raise
+        return np.frombuffer(result.stdout, dtype=np.int16).astype(np.float32) / 32768.0
+
+    def decode_audio(self, video_path) -> np.ndarray:
+        """Decode the first audio stream of a video into a mono float32 array at self.sample_rate."""
+        with av.open(video_path) as container:
+            if not container.streams.audio:
+                return np.zeros(0, dtype=np.float32)
+            stream = container.streams.audio[0]
+            resampler = av.AudioResampler(
+                format='flt', layout='mono', rate=self.sample_rate)
+            chunks = []
+            for frame in container.decode(stream):
+                chunks.extend(f.to_ndarray() for f in resampler.resample(frame))
+            # Flush samples buffered inside the resampler
+            chunks.extend(f.to_ndarray() for f in resampler.resample(None))
+
+        if not chunks:
+            return np.zeros(0, dtype=np.float32)
+        return np.concatenate(chunks, axis=1).ravel()
 
     def generate_spectrogram(self, ndarray: np.ndarray, sr: int, output_path: str,
-                             height_px: int = 256,
-                             dpi: int = 100) -> None:
+                             height_px: int = 256) -> None:
         """Generate mel spectrogram from audio ndarray in 500-12000Hz range"""
         start_total = time.time()
         duration = len(ndarray) / sr
@@ -51,86 +95,105 @@ class AudioProcessor:
         n_fft = 2048
         hop_length = int(sr / self.spectrogram_px_per_sec)
 
-        mel_spec = librosa.feature.melspectrogram(
-            y=ndarray,
-            sr=sr,
-            n_fft=n_fft,
-            hop_length=hop_length,
-            n_mels=128,
-            fmin=200,
-            fmax=12000,
-            power=2.0
-        )
+        mel_spec = self._mel_power(ndarray, sr, n_fft, hop_length)
         S_db = librosa.power_to_db(mel_spec, ref=np.max)
 
-        # Use plt.figure in a try-finally block to ensure cleanup
-        try:
-            fig = plt.figure(figsize=(width_px/dpi, height_px/dpi))
-            ax = plt.Axes(fig, [0., 0., 1., 1.])
-            ax.set_axis_off()
-            fig.add_axes(ax)
-
-            librosa.display.specshow(
-                S_db, sr=sr, ax=ax,
-                cmap='magma',
-                x_axis='time',
-                y_axis='mel',
-                hop_length=hop_length,
-                vmin=-60,
-                vmax=0
-            )
+        # Map [-60, 0] dB onto the magma colormap directly, low frequencies at the bottom
+        levels = np.clip((S_db[::-1] + 60) / 60 * 255, 0, 255).astype(np.uint8)
+        rgb = _MAGMA_LUT[levels]
 
-            plt.savefig(output_path, dpi=dpi, bbox_inches=None,
-                        pad_inches=0, format='jpeg', pil_kwargs={'quality': 85, 'optimize': True})
-        finally:
-            # Ensure proper cleanup of matplotlib resources
-            plt.close('all')  # Close all figures to prevent memory leaks
+        image = Image.fromarray(rgb, 'RGB').resize(
+            (max(width_px, 1), height_px), Image.BILINEAR)
+        image.save(output_path, format='JPEG', quality=85, optimize=True)
 
         self.logger.info(
             f"Total spectrogram generation time: {time.time() - start_total:.2f}s")
 
+    def _mel_power(self, y: np.ndarray, sr: int, n_fft: int, hop_length: int) -> np.ndarray:
+        """
+        Mel power spectrogram, equivalent to librosa.feature.melspectrogram with
+        centered, zero-padded Hann frames.
+
+        The mel filterbank and window are built once per (sr, n_fft) and the STFT
+        runs through scipy's multi-threaded pocketfft in fixed-size frame blocks.
+        """
+        if self._mel_basis_key != (sr, n_fft):
+            self._mel_basis = librosa.filters.mel(
+                sr=sr, n_fft=n_fft, n_mels=128, fmin=200, fmax=12000).astype(np.float32)
+            self._window = scipy.signal.get_window('hann', n_fft, fftbins=True).astype(np.float32)
+            self._mel_basis_key = (sr, n_fft)
+
+        padded = np.pad(y, n_fft // 2, mode='constant')
+        if len(padded) < n_fft:
+            padded = np.pad(padded, (0, n_fft - len(padded)), mode='constant')
+        frames = np.lib.stride_tricks.sliding_window_view(padded, n_fft)[::hop_length]
+
+        mel_spec = np.empty((self._mel_basis.shape[0], len(frames)), dtype=np.float32)
+        for start in range(0, len(frames), _STFT_BLOCK_FRAMES):
+            block = frames[start:start + _STFT_BLOCK_FRAMES] * self._window
+            spectrum = scipy.fft.rfft(block, n=n_fft, axis=-1, workers=-1)
+            power = spectrum.real ** 2 + spectrum.imag ** 2
+            mel_spec[:, start:start + len(block)] = self._mel_basis @ power.T
+        return mel_spec
+
     def get_regional_species(self):
         species = self.species_list.return_list(
             lat=self.lat, lon=self.lon, date=datetime.now(), threshold=0.03)
         return [s['common_name'] for s in species]
 
-    def merge_detections(self, detections):
+    def merge_detections(self, detections, max_gap=1.0):
         """
         Merge adjacent detections of the same species.
 
+        Detections are grouped per species and sorted by start time once; runs
+        separated by no more than max_gap seconds are collapsed with vectorized
+        numpy reductions, keeping the latest end time and highest confidence.
+
         Args:
             detections (list): List of detection dictionaries
+            max_gap (float): Maximum gap in seconds between merged detections
 
         Returns:
-            list: Merged detections
+            list: Merged detections ordered by start time
         """
         if not detections:
             return []
 
-        sorted_detections = sorted(detections, key=lambda x: x['start_time'])
+        species = np.array([d['species_name'] for d in detections])
+        starts = np.array([d['start_time'] for d in detections], dtype=np.float64)
+        ends = np.array([d['end_time'] for d in detections], dtype=np.float64)
+        confs = np.array([d['confidence'] for d in detections], dtype=np.float64)
+
+        _, species_idx = np.unique(species, return_inverse=True)
+        order = np.lexsort((starts, species_idx))
+        # Boundaries between species groups in the sorted order
+        group_bounds = np.flatnonzero(np.diff(species_idx[order])) + 1
+
         merged = []
-        current = sorted_detections[0]
-
-        for next_det in sorted_detections[1:]:
-            # Check if detections are for the same species and effectively adjacent
-            if (current['species_name'] == next_det['species_name'] and
-                    next_det['start_time'] - current['end_time'] <= 1.0):  # Within 1 second
-                # Merge by extending the end time and keeping the higher confidence
-                current['end_time'] = max(
-                    current['end_time'], next_det['end_time'])
-                current['confidence'] = max(
-                    current['confidence'], next_det['confidence'])
-            else:
-                merged.append(current)
-                current = next_det
+        for group in np.split(order, group_bounds):
+            group_starts = starts[group]
+            group_ends = ends[group]
+            # A new run starts where the gap to the furthest end so far exceeds max_gap
+            run_end = np.maximum.accumulate(group_ends)
+            new_run = np.empty(len(group), dtype=bool)
+            new_run[0] = True
+            new_run[1:] = group_starts[1:] - run_end[:-1] > max_gap
+            run_starts = np.flatnonzero(new_run)
+
+            max_ends = np.maximum.reduceat(group_ends, run_starts)
+            max_confs = np.maximum.reduceat(confs[group], run_starts)
+            for run_start, end_time, confidence in zip(run_starts, max_ends, max_confs):
+                det = detections[group[run_start]].copy()
+                det['end_time'] = float(end_time)
+                det['confidence'] = float(confidence)
+                merged.append(det)
 
-        merged.append(current)
+        merged.sort(key=lambda d: d['start_time'])
         return merged
 
     def run(self, video_path):
         self.logger.info(f'Processing audio from video "{video_path}"...')
         st = time.time()
-        temp_audio_path = None
 
         try:
             # Validate video file exists
@@ -138,17 +201,22 @@ class AudioProcessor:
                 self.logger.error(f"Video file does not exist: {video_path}")
                 return [], None
             
-            # Extract audio to temporary WAV file
-            temp_audio_path = self.extract_audio(video_path)
-            
-            # Validate temp audio file was created
-            if not os.path.exists(temp_audio_path):
-                self.logger.error(f"Temp audio file was not created: {temp_audio_path}")
+            if AV_AVAILABLE:
+                # Decode straight into memory, no ffmpeg process needed
+                samples = self.decode_audio(video_path)
+            else:
+                samples = self.extract_audio(video_path)
+            if samples.size == 0:
+                self.logger.info(f"No audio stream found in {video_path}")
                 return [], None
 
-            recording = Recording(
+            # float32 halves memory traffic through the STFT and mel projection
+            samples = samples.astype(np.float32, copy=False)
+
+            recording = RecordingBuffer(
                 self.analyzer,
-                temp_audio_path,
+                samples,
+                self.sample_rate,
                 lat=self.lat,
                 lon=self.lon,
                 date=datetime.now(),
@@ -173,10 +241,10 @@ class AudioProcessor:
                 try:
                     spectrogram_path = os.path.join(
                         os.path.dirname(video_path), f"spectrogram_{self.spectrogram_px_per_sec}.jpg")
-                    self.generate_spectrogram(
-                        recording.ndarray, self.sample_rate, spectrogram_path)
+                    self.generate_spectrogram(samples, self.sample_rate, spectrogram_path)
                 except Exception as e:
                     self.logger.error(f"Failed to generate spectrogram: {e}", exc_info=True)
+                    spectrogram_path = None
                     # Continue without spectrogram
 
             self.logger.info(
@@ -190,10 +258,3 @@ class AudioProcessor:
         except Exception as e:
             self.logger.error(f'Error processing audio: {e}', exc_info=True)
             return [], None
-        finally:
-            # Cleanup temporary file
-            if temp_audio_path and os.path.exists(temp_audio_path):
-                try:
-                    os.remove(temp_audio_path)
-                except OSError as e:
-                    self.logger.warning(f"Failed to remove temp audio file {temp_audio_path}: {e}")
@@ -1,6 +1,5 @@
 import logging
 import time
-from collections import Counter
 
 logger = logging.getLogger(__name__)
 
@@ -10,6 +9,9 @@ MIN_CONFIDENCE_TO_PROCESS = 0.10
 
 
 class DecisionMaker():
+    __slots__ = ('max_record_seconds', 'max_inactive_seconds', 'min_track_duration',
+                 'stop_recording_decided', 'species_decided', 'start_time', 'inactive_start_time')
+
     def __init__(self,  max_record_seconds=60, max_inactive_seconds=10, min_track_duration=2):
         # Validate input parameters
         if max_record_seconds <= 0:
@@ -27,13 +29,13 @@ class DecisionMaker():
     def reset(self):
         self.stop_recording_decided = False
         self.species_decided = False
-        self.start_time = time.time()
+        self.start_time = time.monotonic()
         self.inactive_start_time = None
 
     def update_has_detections(self, has_detections):
         if not has_detections:
             if self.inactive_start_time is None:
-                self.inactive_start_time = time.time()
+                self.inactive_start_time = time.monotonic()
         else:
             self.inactive_start_time = None
 
@@ -41,10 +43,12 @@ class DecisionMaker():
         if self.stop_recording_decided:
             # already decided once
             return False
+        # Single monotonic clock read per call, immune to wall-clock jumps
+        now = time.monotonic()
         reached_max_record_seconds = (
-            time.time() - self.start_time) >= self.max_record_seconds
-        reached_max_inactive_seconds = self.inactive_start_time and (
-            time.time() - self.inactive_start_time) >= self.max_inactive_seconds
+            now - self.start_time) >= self.max_record_seconds
+        reached_max_inactive_seconds = self.inactive_start_time is not None and (
+            now - self.inactive_start_time) >= self.max_inactive_seconds
         decision = reached_max_inactive_seconds or reached_max_record_seconds
         self.stop_recording_decided = decision
         return decision
@@ -53,10 +57,12 @@ class DecisionMaker():
         if self.species_decided:
             # already decided once
             return None
-        results = self.get_results(tracks)
-        if len(results) > 0:
+        # Called every frame until decided: stop at the first accepted track
+        # instead of building the full result list
+        first = next(self._iter_results(tracks), None)
+        if first is not None:
             self.species_decided = True
-            return results[0]['species_name']
+            return first['species_name']
         return None
 
     def get_results(self, tracks):
@@ -64,7 +70,19 @@ class DecisionMaker():
             logger.error(f"Invalid tracks type: {type(tracks)}")
             return []
             
-        result = []
+        result = list(self._iter_results(tracks))
+        
+        if result:
+            logger.info(f'Final results: {len(result)} tracks accepted')
+        else:
+            logger.debug(f'No tracks met acceptance criteria (processed {len(tracks)} tracks)')
+
+        return result
+
+    def _iter_results(self, tracks):
+        """Yield a result dict for each accepted track, in track order."""
+        if not isinstance(tracks, dict):
+            return
         for track_id, track in tracks.items():
             try:
                 # Validate track structure
@@ -80,24 +98,37 @@ class DecisionMaker():
                 if 'start_time' not in track or 'end_time' not in track:
                     logger.warning(f"Missing time fields for track_id {track_id}")
                     continue
-                    
-                # Find most common prediction for each track
-                # preds is a list of (species_name, confidence)
-                species_only = [p[0] for p in track['preds']]
-                if not species_only:
-                    continue
-                    
-                pred_counts = Counter(species_only)
-                species_name, count = pred_counts.most_common(1)[0]
-                
-                voting_confidence = count / len(track['preds'])
-                
-                # Calculate average classifier confidence for the winning species
-                relevant_confs = [p[1] for p in track['preds'] if p[0] == species_name]
-                if not relevant_confs:
+
+                # Only consider tracks with at least min_track_duration; checked before
+                # the preds scan since short tracks are discarded regardless
+                duration = track['end_time'] - track['start_time']
+                if duration < self.min_track_duration:
+                    logger.debug(
+                        f'Track {track_id} REJECTED (duration): '
+                        f'duration: {duration:.1f}s < min: {self.min_track_duration}s'
+                    )
                     continue
                     
-                avg_classifier_conf = sum(relevant_confs) / len(relevant_confs)
+                # Find most common prediction for each track
+                # preds is a list of (species_name, confidence); one pass accumulates
+                # [count, confidence_sum] per species
+                preds = track['preds']
+                agg = {}
+                for name, conf in preds:
+                    entry = agg.get(name)
+                    if entry:
+                        entry[0] += 1
+                        entry[1] += conf
+                    else:
+                        agg[name] = [1, conf]
+
+                # max() keeps the first-seen species on ties, like Counter.most_common
+                species_name, (count, conf_sum) = max(agg.items(), key=lambda kv: kv[1][0])
+
+                voting_confidence = count / len(preds)
+
+                # Average classifier confidence for the winning species
+                avg_classifier_conf = conf_sum / count
                 
                 # Combine confidences
                 confidence = voting_confidence * avg_classifier_conf
@@ -107,36 +138,21 @@ class DecisionMaker():
                     logger.debug(f"Skipping track {track_id} with {confidence:.0%} confidence - below threshold")
                     continue
                 
-                # Only consider species with at least min_track_duration
-                duration = track['end_time'] - track['start_time']
-                if duration >= self.min_track_duration:
-                    logger.info(
-                        f'Track {track_id} ACCEPTED: {species_name} | '
-                        f'confidence: {confidence:.1%} (voting: {voting_confidence:.1%}, avg_cls: {avg_classifier_conf:.1%}) | '
-                        f'duration: {duration:.1f}s | predictions: {len(track["preds"])}'
-                    )
-                    result.append({
-                        'track_id': track_id,
-                        'species_name': species_name,
-                        'start_time': track['start_time'],
-                        'end_time': track['end_time'],
-                        'confidence': confidence,
-                        'best_frame': track.get('best_frame'),
-                        'source': 'video',
-                        'frames': track.get('frames', [])  # Per-frame bounding box data
-                    })
-                else:
-                    logger.debug(
-                        f'Track {track_id} REJECTED (duration): {species_name} | '
-                        f'duration: {duration:.1f}s < min: {self.min_track_duration}s'
-                    )
+                logger.info(
+                    f'Track {track_id} ACCEPTED: {species_name} | '
+                    f'confidence: {confidence:.1%} (voting: {voting_confidence:.1%}, avg_cls: {avg_classifier_conf:.1%}) | '
+                    f'duration: {duration:.1f}s | predictions: {len(preds)}'
+                )
+                yield {
+                    'track_id': track_id,
+                    'species_name': species_name,
+                    'start_time': track['start_time'],
+                    'end_time': track['end_time'],
+                    'confidence': confidence,
+                    'best_frame': track.get('best_frame'),
+                    'source': 'video',
+                    'frames': list(track.get('frames', []))  # Per-frame bounding box data
+                }
             except Exception as e:
                 logger.error(f"Error processing track {track_id}: {e}", exc_info=True)
                 continue
-        
-        if result:
-            logger.info(f'Final results: {len(result)} tracks accepted')
-        else:
-            logger.debug(f'No tracks met acceptance criteria (processed {len(tracks)} tracks)')
-
-        return result
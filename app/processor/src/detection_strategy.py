@@ -1,13 +1,120 @@
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
 import logging
-from typing import List, Optional, Tuple
+import os
+import re
+import shutil
+from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 import numpy as np
+import torch
 from ultralytics import YOLO
 import cv2
+import fast_filter
 
 logger = logging.getLogger(__name__)
 
+# Exported TensorRT engines are cached here so cold starts skip the export
+ENGINE_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'models', '.engine_cache')
+
+
+def supports_batch_inference(model_path: str) -> bool:
+    """
+    Whether a model can run several frames in one inference call.
+
+    PyTorch weights (and the dynamic-batch engines exported from them) can;
+    the NCNN backend only ever runs the first image of a batch.
+    """
+    return model_path.endswith('.pt')
+
+
+def load_yolo_model(model_path: str, task: str, imgsz: int, half: bool = True, batch: int = 1, int8: bool = False,
+                    int8_data: Optional[str] = None) -> YOLO:
+    """
+    Load a YOLO model, compiling PyTorch weights to a TensorRT engine when possible.
+
+    Only `.pt` weights on a CUDA device are exported (FP16 by default); the engine
+    is cached per (model file, imgsz, half, int8, calibration data, batch, GPU) in ENGINE_CACHE_DIR. Any other
+    format (e.g. the NCNN models used on the Raspberry Pi) or a failed export
+    falls back to loading model_path directly.
+
+    Args:
+        model_path: Path to the model weights or exported model directory
+        task: Ultralytics task ("detect" or "classify")
+        imgsz: Fixed inference size the engine is built for
+        half: Build an FP16 engine
+        int8: Build an INT8 engine; layers TensorRT can't quantize stay in FP16 when
+            half is set. Ignored (FP16 engine) unless int8_data is given
+        int8_data: Dataset YAML whose images calibrate the INT8 engine
+        batch: Largest batch the engine must accept (dynamic batch when > 1)
+    """
+    if not model_path.endswith('.pt'):
+        return YOLO(model_path, task=task)
+
+    try:
+        if not torch.cuda.is_available():
+            return YOLO(model_path, task=task)
+        gpu_name = torch.cuda.get_device_name(0)
+
+        if int8 and not int8_data:
+            # Without it ultralytics would download and calibrate on its sample dataset
+            logger.warning(f'No INT8 calibration dataset configured for {model_path}, building an FP16 engine')
+            int8 = False
+        calibration = os.path.abspath(int8_data) if int8 else None
+
+        st = os.stat(model_path)
+        key = hashlib.blake2b(
+            repr((os.path.abspath(model_path), st.st_mtime_ns, imgsz, half, int8, calibration, batch, gpu_name)).encode(),
+            digest_size=16).hexdigest()
+        engine_path = os.path.join(ENGINE_CACHE_DIR, f"{os.path.splitext(os.path.basename(model_path))[0]}_{key}.engine")
+
+        if not os.path.exists(engine_path):
+            logger.info(f'Exporting {model_path} to TensorRT (imgsz={imgsz}, half={half}, int8={int8}) on {gpu_name}...')
+            exported = YOLO(model_path, task=task).export(
+                format='engine', imgsz=imgsz, half=half, int8=int8, data=calibration,
+                dynamic=batch > 1, batch=batch, device=0)
+            os.makedirs(ENGINE_CACHE_DIR, exist_ok=True)
+            shutil.move(exported, engine_path)
+        return YOLO(engine_path, task=task)
+    except Exception as e:
+        logger.warning(f'TensorRT export unavailable for {model_path}, using original weights: {e}')
+        return YOLO(model_path, task=task)
+
+
+def run_concurrently(*fns):
+    """
+    Run independent callables on separate threads and wait for all of them.
+
+    On CUDA each runs on its own stream, so e.g. two models' warmups (kernel
+    compilation, cudnn autotuning) overlap instead of queueing. Exceptions are
+    re-raised in the caller.
+    """
+    def on_own_stream(fn):
+        if not torch.cuda.is_available():
+            return fn()
+        stream = torch.cuda.Stream()
+        with torch.cuda.stream(stream):
+            result = fn()
+        stream.synchronize()
+        return result
+
+    with ThreadPoolExecutor(max_workers=len(fns)) as executor:
+        futures = [executor.submit(on_own_stream, fn) for fn in fns]
+        return [future.result() for future in futures]
+
+
+def match_class_ids(names: Dict[int, str], regional_species: List[str]) -> List[int]:
+    """
+    Class ids whose label contains any of the regional species names.
+
+    All names are matched in a single compiled alternation per label instead
+    of one substring test per (label, species) pair.
+    """
+    pattern = re.compile('|'.join(map(re.escape, regional_species)))
+    return [cid for cid, label in names.items() if pattern.search(label)]
+
+
 @dataclass
 class DetectionResult:
     """
@@ -29,15 +136,21 @@ class DetectionResult:
     crop: Optional[np.ndarray] = None
 
 class DetectionStrategy(ABC):
-    def __init__(self, min_center_dist: float = 0.1, min_box_size_px: int = 50, blur_threshold: float = 100.0, max_blur_checks: int = 3):
+    def __init__(self, min_center_dist: float = 0.1, min_box_size_px: int = 50, blur_threshold: float = 100.0, max_blur_checks: int = 3, blur_check_size: int = 128):
         self.min_center_dist = min_center_dist
         self.min_box_size_px = min_box_size_px
         self.blur_threshold = blur_threshold
         self.max_blur_checks = max_blur_checks
+        self.blur_check_size = blur_check_size
+        fast_filter.warmup()
 
     def is_blurry(self, image: np.ndarray) -> Tuple[bool, float]:
         """
         Check if the image is blurry using the variance of the Laplacian.
+
+        Crops larger than blur_check_size on their longest side are downsampled
+        first, so the variance is measured at a comparable scale for every crop
+        and large crops cost no more than small ones.
         
         Args:
             image: BGR image crop
@@ -48,71 +161,102 @@ class DetectionStrategy(ABC):
         """
         if image is None or image.size == 0:
             return True, 0.0
+
+        h, w = image.shape[:2]
+        scale = self.blur_check_size / max(h, w)
+        if scale < 1:
+            image = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
         
+        # cvtColor, Laplacian and meanStdDev are SIMD kernels; on crops capped at
+        # blur_check_size a fused single-pass numba kernel measured no faster
         gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        variance = cv2.Laplacian(gray, cv2.CV_64F).var()
+        # The 3x3 Laplacian of an 8-bit image fits in int16 exactly; meanStdDev
+        # reduces it in C without a float64 temporary
+        laplacian = cv2.Laplacian(gray, cv2.CV_16S)
+        _, stddev = cv2.meanStdDev(laplacian)
+        variance = float(stddev[0, 0]) ** 2
         
         is_blur = variance < self.blur_threshold
         if is_blur:
             logger.info(f"Blur detected: variance={variance:.1f} < threshold={self.blur_threshold}")
         return is_blur, variance
 
+    # Frames are passed to model.track() as numpy arrays on purpose. A tensor
+    # pre-staged on the GPU skips host-side letterboxing, but ultralytics copies
+    # tensor sources back to the host for Results.orig_img, and calling
+    # predictor.inference() directly bypasses the tracker callbacks. For the same
+    # reason host frames are not staged in pinned memory: ultralytics does the
+    # host-to-device copy itself after letterboxing. Capture already overlaps
+    # detection through FramePrefetcher and FrameProcessor.submit().
     @abstractmethod
     def detect(self, frame: np.ndarray, tracker_config: str, min_confidence: float) -> List[DetectionResult]:
         pass
+
+    def detect_batch(self, frames: List[np.ndarray], tracker_config: str, min_confidence: float) -> List[List[DetectionResult]]:
+        """
+        Detect on consecutive frames of one stream, returning one result list per frame.
+
+        The default runs detect() frame by frame; strategies override it to run
+        the detector once over the whole batch.
+        """
+        return [self.detect(frame, tracker_config, min_confidence) for frame in frames]
     
     @abstractmethod
     def reset(self):
         pass
 
+    def warmup(self):
+        """Run the models once on a blank input so the first real frame isn't slowed by lazy init."""
+        pass
 
-    def is_valid_detection(self, bbox: List[float], conf: float, min_confidence: float) -> bool:
+    @staticmethod
+    def boxes_to_numpy(boxes, frame_shape) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
         """
-        Check if detection center is not too close to edges and confidence is sufficient.
-        
-        Args:
-            bbox: Normalized bounding box [x1, y1, x2, y2]
-            conf: Detection confidence
-            min_confidence: Minimum required confidence
-        """
-        x1, y1, x2, y2 = bbox
+        Pull tracked boxes to host memory in a single device-to-host transfer.
 
-        # Calculate center point
-        center_x = (x1 + x2) / 2
-        center_y = (y1 + y2) / 2
+        Reads the packed `boxes.data` tensor ([x1, y1, x2, y2, track_id, conf, cls]
+        per row) once instead of copying id, cls, conf, xyxyn and xyxy separately.
 
-        # Check if center is too close to any edge
-        if (center_x < self.min_center_dist or  # Too close to left
-            center_x > (1 - self.min_center_dist) or  # Too close to right
-            center_y < self.min_center_dist or  # Too close to top
-                center_y > (1 - self.min_center_dist)):  # Too close to bottom
-            return False
+        Returns:
+            Tuple of (track_ids, class_indexes, confidences, xyxyn, xyxy) arrays.
+        """
+        data = boxes.data.cpu().numpy()
+        h, w = frame_shape[:2]
+        xyxy = data[:, :4]
+        xyxyn = xyxy / np.array([w, h, w, h], dtype=xyxy.dtype)
+        return data[:, 4].astype(int), data[:, 6].astype(int), data[:, 5], xyxyn, xyxy
 
-        # Skip if confidence is too low
-        if conf < min_confidence:
-            return False
+    def filter_boxes(self, xyxyn: np.ndarray, xyxy: np.ndarray, confidences: np.ndarray, frame_shape, min_confidence: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Apply the edge, confidence and minimum crop size checks to all boxes of a frame.
 
-        return True
+        Returns:
+            Tuple of ((N,) boolean keep mask, (N, 4) int32 crop coordinates)
+        """
+        return fast_filter.filter_boxes(xyxyn, xyxy, confidences, frame_shape,
+                                        self.min_center_dist, self.min_box_size_px, min_confidence)
 
 class SingleStageStrategy(DetectionStrategy):
-    def __init__(self, model_path: str, regional_species: Optional[List[str]] = None, min_center_dist: float = 0.1):
+    def __init__(self, model_path: str, regional_species: Optional[List[str]] = None, min_center_dist: float = 0.1, batch_size: int = 1, int8: bool = False, int8_data: Optional[str] = None):
         super().__init__(min_center_dist)
         self.logger = logging.getLogger(self.__class__.__name__)
-        self.model = YOLO(model_path, task="detect")
+        self.batch_size = batch_size if supports_batch_inference(model_path) else 1
+        self.model = load_yolo_model(model_path, task="detect", imgsz=640, batch=self.batch_size, int8=int8, int8_data=int8_data)
         self.regional_species = regional_species
         self.classes = None
         
         if self.regional_species:
              self.logger.info(f'Initializing with regional species filters: {self.regional_species}')
-             self.classes = [id for id, label in self.model.names.items() if any(
-                reg_species in label for reg_species in self.regional_species)]
+             self.classes = match_class_ids(self.model.names, self.regional_species)
              
              # Log the actual class names that are enabled
              enabled_classes = [self.model.names[id] for id in self.classes]
              self.logger.info(f'Regional species filters active: {len(self.classes)} classes enabled.')
              self.logger.info(f'Enabled classes: {enabled_classes}')
 
-        # Warmup
+        self.warmup()
+
+    def warmup(self):
         self.model.track(np.zeros((640, 640, 3)), tracker="bytetrack.yaml", persist=True, verbose=False)
 
     def detect(self, frame: np.ndarray, tracker_config: str, min_confidence: float) -> List[DetectionResult]:
@@ -120,43 +264,48 @@ class SingleStageStrategy(DetectionStrategy):
             frame, persist=True, conf=min_confidence,
             classes=self.classes, tracker=tracker_config, verbose=False)
         
-        if not results or results[0].boxes.id is None:
+        if not results:
+            return []
+        return self._process_result(frame, results[0], min_confidence)
+
+    def detect_batch(self, frames: List[np.ndarray], tracker_config: str, min_confidence: float) -> List[List[DetectionResult]]:
+        if self.batch_size == 1:
+            return super().detect_batch(frames, tracker_config, min_confidence)
+        # A list source shares one tracker that is updated frame by frame in order
+        results = self.model.track(
+            list(frames), persist=True, conf=min_confidence,
+            classes=self.classes, tracker=tracker_config, verbose=False)
+        return [self._process_result(frame, result, min_confidence)
+                for frame, result in zip(frames, results)]
+
+    def _process_result(self, frame: np.ndarray, result, min_confidence: float) -> List[DetectionResult]:
+        if result.boxes.id is None:
             return []
 
-        boxes = results[0].boxes
-        track_ids = boxes.id.int().cpu().tolist()
-        class_indexes = boxes.cls.int().cpu().tolist()
-        confidences = boxes.conf.cpu().tolist()
-        xyxyn = boxes.xyxyn.cpu().numpy()
-        xyxy = boxes.xyxy.cpu().numpy()
+        track_ids, class_indexes, confidences, xyxyn, xyxy = self.boxes_to_numpy(
+            result.boxes, frame.shape)
 
-        h, w, _ = frame.shape
+        # Edge, confidence and min size checks plus crop clamping in one pass
+        keep, coords = self.filter_boxes(xyxyn, xyxy, confidences, frame.shape, min_confidence)
 
         detection_results = []
-        for track_id, class_idx, conf, bbox_norm, bbox_abs in zip(track_ids, class_indexes, confidences, xyxyn, xyxy):
-            if not self.is_valid_detection(bbox_norm, conf, min_confidence):
-                continue
-            
-            # Check min size
-            x1n, y1n, x2n, y2n = bbox_norm
-            if (x2n - x1n) * w < self.min_box_size_px or (y2n - y1n) * h < self.min_box_size_px:
-                continue
-            
+        for i in np.flatnonzero(keep):
+            track_id, class_idx, conf = int(track_ids[i]), int(class_indexes[i]), float(confidences[i])
+            bbox_norm = xyxyn[i]
+
             # Extract crop and compute blur
-            x1, y1, x2, y2 = map(int, bbox_abs)
-            x1, y1 = max(0, x1), max(0, y1)
-            x2, y2 = min(w, x2), min(h, y2)
-            
-            if x2 <= x1 or y2 <= y1:
-                continue
+            x1, y1, x2, y2 = coords[i].tolist()
                 
-            crop = frame[y1:y2, x1:x2].copy()
-            is_blur, blur_variance = self.is_blurry(crop)
+            # Blur check only reads pixels, so test a view and copy once accepted
+            crop_view = frame[y1:y2, x1:x2]
+            is_blur, blur_variance = self.is_blurry(crop_view)
             
             # Skip blurry detections (same as TwoStageStrategy)
             if is_blur:
                 continue
 
+            crop = crop_view.copy()
+
             class_name = self.model.names[class_idx]
             self.logger.info(f'Track {track_id}: {class_name} ({conf:.1%}) | blur_var: {blur_variance:.1f}')
             
@@ -180,33 +329,47 @@ class SingleStageStrategy(DetectionStrategy):
 
 
 class TwoStageStrategy(DetectionStrategy):
-    def __init__(self, binary_model_path: str, classifier_model_path: str, regional_species: Optional[List[str]] = None, min_center_dist: float = 0.1, min_box_size_px: int = 50, blur_threshold: float = 100.0):
+    def __init__(self, binary_model_path: str, classifier_model_path: str, regional_species: Optional[List[str]] = None, min_center_dist: float = 0.1, min_box_size_px: int = 50, blur_threshold: float = 100.0, batch_size: int = 1, int8: bool = False, int8_data: Optional[str] = None):
         super().__init__(min_center_dist, min_box_size_px, blur_threshold)
         self.logger = logging.getLogger(self.__class__.__name__)
         self.regional_species = regional_species
         
-        self.binary_model = YOLO(binary_model_path, task="detect")
-        self.classifier_model = YOLO(classifier_model_path, task="classify")
+        self.batch_size = batch_size if supports_batch_inference(binary_model_path) else 1
+        # Only the detector is quantized; species scores are kept at FP16 precision
+        self.binary_model = load_yolo_model(binary_model_path, task="detect", imgsz=320, batch=self.batch_size,
+                                            int8=int8, int8_data=int8_data)
+        self.classifier_model = load_yolo_model(classifier_model_path, task="classify", imgsz=224)
         
         # Round-robin index for classification scheduling
         self._classification_index = 0
         
+        # Display names never change, so normalize them once
+        self._names_display = {
+            cid: self._normalize_class_name(label) for cid, label in self.classifier_model.names.items()}
+
         # Pre-calculate allowed class IDs for regional species
         self.classes = None
+        self._regional_idx = None
         if self.regional_species:
             self.logger.info(f'Initializing with regional species filters: {self.regional_species}')
-            self.classes = [
-                id for id, label in self.classifier_model.names.items() 
-                if any(reg_species in self._normalize_class_name(label) for reg_species in self.regional_species)
-            ]
+            self.classes = match_class_ids(self._names_display, self.regional_species)
             # Log the actual class names that are enabled
-            enabled_classes = [self._normalize_class_name(self.classifier_model.names[id]) for id in self.classes]
+            enabled_classes = [self._names_display[id] for id in self.classes]
             self.logger.info(f'Regional species filters active: {len(self.classes)} classes enabled.')
             self.logger.info(f'Enabled classes: {enabled_classes}')
 
-        # Warmup
-        self.binary_model.track(np.zeros((320, 320, 3), dtype=np.uint8), tracker="bytetrack.yaml", persist=True, verbose=False)
-        self.classifier_model(np.zeros((224, 224, 3), dtype=np.uint8), verbose=False)
+        # The species filter is fixed for the strategy's lifetime, so pick the
+        # classification path once instead of branching per crop
+        self._classify_crop = self._classify_crop_regional if self.classes else self._classify_crop_topk
+
+        self.warmup()
+
+    def warmup(self):
+        """Warm up the detector and the classifier concurrently."""
+        run_concurrently(
+            lambda: self.binary_model.track(np.zeros((320, 320, 3), dtype=np.uint8), tracker="bytetrack.yaml", persist=True, verbose=False),
+            lambda: self.classifier_model(np.zeros((224, 224, 3), dtype=np.uint8), verbose=False),
+        )
 
     def _normalize_class_name(self, name: str) -> str:
         """
@@ -223,46 +386,72 @@ class TwoStageStrategy(DetectionStrategy):
         """
         return name.replace('_OR_', '/').replace('_', ' ')
 
-    def _classify_crop(self, crop: np.ndarray) -> Tuple[Optional[str], float]:
+    def _regional_index(self, all_probs: torch.Tensor) -> torch.Tensor:
+        """Regional class ids as an index tensor on the probabilities' device, built once."""
+        if self._regional_idx is None or self._regional_idx.device != all_probs.device:
+            self._regional_idx = torch.tensor(
+                [cid for cid in self.classes if cid < len(all_probs)], dtype=torch.long, device=all_probs.device)
+        return self._regional_idx
+
+    def _run_classifier(self, crop: np.ndarray):
         """
-        Run classification on a crop, manually filtering for regional species if configured since ultralytics classifier ignores 'classes' arg.
-        Returns: (species_name, confidence)
+        Run the classifier on a crop.
+        Returns: probs, or None if there was no result
         """
         result_cls = self.classifier_model(crop, verbose=False)
         
         if not result_cls or not result_cls[0].probs:
             self.logger.debug('Classification returned no results')
+            return None
+        return result_cls[0].probs
+
+    def _classify_crop_regional(self, crop: np.ndarray) -> Tuple[Optional[str], float]:
+        """
+        Run classification on a crop, manually filtering for regional species since ultralytics classifier ignores 'classes' arg.
+        Returns: (species_name, confidence)
+        """
+        probs = self._run_classifier(crop)
+        if probs is None:
             return None, 0.0
-            
-        probs = result_cls[0].probs
+
+        # Filter for best regional species with one gather and one host sync
+        all_probs = probs.data
+        regional_idx = self._regional_index(all_probs)
         
-        if self.classes:
-            # Filter for best regional species
-            all_probs = probs.data
-            valid_probs = {cid: all_probs[cid].item() for cid in self.classes if cid < len(all_probs)}
+        if len(regional_idx):
+            top_confs, top_pos = torch.topk(all_probs.index_select(0, regional_idx), min(3, len(regional_idx)))
+            top3 = list(zip(regional_idx[top_pos].tolist(), top_confs.tolist()))
+            best_id, best_conf = top3[0]
+            species_name = self._names_display[best_id]
             
-            if valid_probs:
-                best_id, best_conf = max(valid_probs.items(), key=lambda x: x[1])
-                species_name = self._normalize_class_name(result_cls[0].names[best_id])
-                
-                # Log top 3 regional species predictions
-                top3 = sorted(valid_probs.items(), key=lambda x: x[1], reverse=True)[:3]
-                top3_str = ', '.join([f"{self._normalize_class_name(result_cls[0].names[cid])}:{conf:.1%}" for cid, conf in top3])
+            # Log top 3 regional species predictions
+            if self.logger.isEnabledFor(logging.INFO):
+                top3_str = ', '.join([f"{self._names_display[cid]}:{conf:.1%}" for cid, conf in top3])
                 self.logger.info(f'Classification result: {species_name} ({best_conf:.1%}) | Top 3: [{top3_str}]')
-                
-                return species_name, best_conf
-            self.logger.debug('No valid regional species found in classification')
-            return "Unknown", 0.0
+            
+            return species_name, best_conf
+        self.logger.debug('No valid regional species found in classification')
+        return "Unknown", 0.0
+
+    def _classify_crop_topk(self, crop: np.ndarray) -> Tuple[Optional[str], float]:
+        """
+        Run classification on a crop over all classifier classes.
+        Returns: (species_name, confidence)
+        """
+        probs = self._run_classifier(crop)
+        if probs is None:
+            return None, 0.0
             
         top1_idx = probs.top1
-        species_name = self._normalize_class_name(result_cls[0].names[top1_idx])
+        species_name = self._names_display[top1_idx]
         conf = probs.top1conf.item()
         
-        # Log top 3 predictions
-        top5_indices = probs.top5
-        top5_confs = probs.top5conf.tolist()
-        top3_str = ', '.join([f"{self._normalize_class_name(result_cls[0].names[idx])}:{top5_confs[i]:.1%}" for i, idx in enumerate(top5_indices[:3])])
-        self.logger.info(f'Classification result: {species_name} ({conf:.1%}) | Top 3: [{top3_str}]')
+        # Log top 3 predictions (top5 is a sort over all classes, so only when logged)
+        if self.logger.isEnabledFor(logging.INFO):
+            top5_indices = probs.top5
+            top5_confs = probs.top5conf.tolist()
+            top3_str = ', '.join([f"{self._names_display[idx]}:{top5_confs[i]:.1%}" for i, idx in enumerate(top5_indices[:3])])
+            self.logger.info(f'Classification result: {species_name} ({conf:.1%}) | Top 3: [{top3_str}]')
         
         return species_name, conf
 
@@ -285,43 +474,43 @@ class TwoStageStrategy(DetectionStrategy):
         results = self.binary_model.track(
             frame, persist=True, conf=min_confidence, verbose=False, imgsz=320, tracker=tracker_config)
             
-        if not results or results[0].boxes.id is None:
+        if not results:
             return []
+        return self._process_result(frame, results[0], min_confidence)
+
+    def detect_batch(self, frames: List[np.ndarray], tracker_config: str, min_confidence: float) -> List[List[DetectionResult]]:
+        """
+        Run the binary detector once over a batch of consecutive frames, then
+        filter and classify each frame as detect() does.
+        """
+        if self.batch_size == 1:
+            return super().detect_batch(frames, tracker_config, min_confidence)
+        # A list source shares one tracker that is updated frame by frame in order
+        results = self.binary_model.track(
+            list(frames), persist=True, conf=min_confidence, verbose=False, imgsz=320, tracker=tracker_config)
+        return [self._process_result(frame, result, min_confidence)
+                for frame, result in zip(frames, results)]
 
-        boxes = results[0].boxes
-        track_ids = boxes.id.int().cpu().tolist()
-        confidences = boxes.conf.cpu().tolist()
-        xyxyn = boxes.xyxyn.cpu().numpy() # normalized for output
-        xyxy = boxes.xyxy.cpu().numpy()   # absolute for cropping
+    def _process_result(self, frame: np.ndarray, result, min_confidence: float) -> List[DetectionResult]:
+        if result.boxes.id is None:
+            return []
 
-        h, w, _ = frame.shape
+        # xyxyn is normalized for output, xyxy absolute for cropping
+        track_ids, _, confidences, xyxyn, xyxy = self.boxes_to_numpy(
+            result.boxes, frame.shape)
 
         # 2. Collect all valid boxes first
-        valid_boxes = []
-        for track_id, conf, bbox_norm, bbox_abs in zip(track_ids, confidences, xyxyn, xyxy):
-            # Check validity BEFORE classification to save compute
-            if not self.is_valid_detection(bbox_norm, conf, min_confidence):
-                continue
+        # Check validity BEFORE classification to save compute; crops are
+        # clamped to the frame and dropped if empty or undersized
+        keep, coords = self.filter_boxes(xyxyn, xyxy, confidences, frame.shape, min_confidence)
 
-            x1, y1, x2, y2 = map(int, bbox_abs)
-            # Clamp
-            x1, y1 = max(0, x1), max(0, y1)
-            x2, y2 = min(w, x2), min(h, y2)
-             
-            if x2 <= x1 or y2 <= y1:
-                continue
-            
-            # Check minimum size
-            box_w = x2 - x1
-            box_h = y2 - y1
-            if box_w < self.min_box_size_px or box_h < self.min_box_size_px:
-                continue
-            
+        valid_boxes = []
+        for i in np.flatnonzero(keep):
             valid_boxes.append({
-                'track_id': track_id,
-                'conf': conf,
-                'bbox_norm': bbox_norm,
-                'crop_coords': (x1, y1, x2, y2)
+                'track_id': int(track_ids[i]),
+                'conf': float(confidences[i]),
+                'bbox_norm': xyxyn[i],
+                'crop_coords': tuple(coords[i].tolist())
             })
         
         if not valid_boxes:
@@ -331,6 +520,9 @@ class TwoStageStrategy(DetectionStrategy):
         valid_boxes.sort(key=lambda b: b['track_id'])
         
         # 3. Round-robin selection - find first non-blurry box to classify
+        # Every candidate is blur checked, even for tracks whose best frame this
+        # crop can't beat: the check also gates classification, and blur
+        # variance has no useful upper bound to prune on before measuring it
         start_idx = self._classification_index % len(valid_boxes)
         self._classification_index += 1
         
@@ -0,0 +1,103 @@
+"""
+Per-frame box filtering for the detection strategies.
+
+filter_boxes() applies the edge-distance, confidence, crop clamping and
+minimum-size checks in one pass. With numba installed the pass is compiled to
+native code; otherwise the same checks run as numpy array operations.
+
+Installation: pip install numba
+"""
+
+import logging
+from typing import Tuple
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# numba is optional: the numpy path gives identical results
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+def _filter_boxes_numpy(xyxyn, xyxy, confidences, w, h, min_center_dist, min_box_size_px, min_confidence):
+    center_x = (xyxyn[:, 0] + xyxyn[:, 2]) / 2
+    center_y = (xyxyn[:, 1] + xyxyn[:, 3]) / 2
+    low, high = min_center_dist, 1 - min_center_dist
+
+    coords = np.clip(xyxy, 0, [w, h, w, h]).astype(np.int32)
+    box_w = coords[:, 2] - coords[:, 0]
+    box_h = coords[:, 3] - coords[:, 1]
+
+    mask = ((center_x >= low) & (center_x <= high) &
+            (center_y >= low) & (center_y <= high) &
+            (confidences >= min_confidence) &
+            (box_w > 0) & (box_h > 0) &
+            (box_w >= min_box_size_px) & (box_h >= min_box_size_px))
+    return mask, coords
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _filter_boxes_numba(xyxyn, xyxy, confidences, w, h, min_center_dist, min_box_size_px, min_confidence):
+        n = xyxy.shape[0]
+        mask = np.zeros(n, dtype=np.bool_)
+        coords = np.empty((n, 4), dtype=np.int32)
+        low, high = min_center_dist, 1 - min_center_dist
+        for i in range(n):
+            # Clamp to the frame, then truncate (same as np.clip + astype)
+            x1 = int(min(max(xyxy[i, 0], 0.0), w))
+            y1 = int(min(max(xyxy[i, 1], 0.0), h))
+            x2 = int(min(max(xyxy[i, 2], 0.0), w))
+            y2 = int(min(max(xyxy[i, 3], 0.0), h))
+            coords[i, 0] = x1
+            coords[i, 1] = y1
+            coords[i, 2] = x2
+            coords[i, 3] = y2
+
+            center_x = (xyxyn[i, 0] + xyxyn[i, 2]) / 2
+            center_y = (xyxyn[i, 1] + xyxyn[i, 3]) / 2
+            if center_x < low or center_x > high or center_y < low or center_y > high:
+                continue
+            if confidences[i] < min_confidence:
+                continue
+            box_w, box_h = x2 - x1, y2 - y1
+            if box_w <= 0 or box_h <= 0 or box_w < min_box_size_px or box_h < min_box_size_px:
+                continue
+            mask[i] = True
+        return mask, coords
+
+
+def filter_boxes(xyxyn: np.ndarray, xyxy: np.ndarray, confidences: np.ndarray, frame_shape,
+                 min_center_dist: float, min_box_size_px: int, min_confidence: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Filter the boxes of one frame and compute their crop coordinates.
+
+    A box is kept if its center is at least min_center_dist from every edge,
+    its confidence is at least min_confidence, and its crop (clamped to the
+    frame) is at least min_box_size_px wide and high.
+
+    Args:
+        xyxyn: (N, 4) normalized boxes [x1, y1, x2, y2]
+        xyxy: (N, 4) absolute boxes in pixels
+        confidences: (N,) detection confidences
+        frame_shape: Shape of the frame the boxes belong to
+
+    Returns:
+        Tuple of ((N,) boolean keep mask, (N, 4) int32 crop coordinates)
+    """
+    h, w = frame_shape[:2]
+    if NUMBA_AVAILABLE:
+        return _filter_boxes_numba(xyxyn, xyxy, confidences, float(w), float(h),
+                                   float(min_center_dist), int(min_box_size_px), float(min_confidence))
+    return _filter_boxes_numpy(xyxyn, xyxy, confidences, w, h, min_center_dist, min_box_size_px, min_confidence)
+
+
+def warmup():
+    """Compile the numba kernel for float32 boxes so the first frame doesn't pay for it."""
+    if not NUMBA_AVAILABLE:
+        return
+    boxes = np.zeros((1, 4), dtype=np.float32)
+    filter_boxes(boxes, boxes, np.zeros(1, dtype=np.float32), (1, 1, 3), 0.1, 1, 0.1)
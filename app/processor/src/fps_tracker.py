@@ -1,21 +1,23 @@
 from timeit import default_timer
 import logging
-from statistics import mean, median
-from typing import List
+
+import numpy as np
 
 
 class FPSTracker:
-    def __init__(self):
+    def __init__(self, capacity=8192):
         self.timer = default_timer
-        self.frame_times: List[float] = []
+        # Preallocated ring of per-frame times; the summary covers the last `capacity` frames
+        self.capacity = capacity
+        self.frame_times = np.empty(capacity, dtype=np.float64)
         self.logger = logging.getLogger(__name__)
         self.reset()
 
     def reset(self):
         """Reset tracking stats for new motion detection sequence"""
-        self.frame_times.clear()
         self.start_time = None
         self.total_frames = 0
+        self.total_time = 0.0
 
     def __call__(self):
         return self.timer()
@@ -26,25 +28,24 @@ class FPSTracker:
 
     def __exit__(self, exc_type, exc_value, exc_traceback):
         frame_time = self() - self.start_time
-        self.frame_times.append(frame_time)
+        self.frame_times[self.total_frames % self.capacity] = frame_time
         self.total_frames += 1
+        self.total_time += frame_time
 
     def log_summary(self):
         """Log FPS statistics for the completed motion sequence"""
-        if not self.frame_times:
+        if not self.total_frames:
             return
 
         # Calculate FPS stats
-        fps_values = [1 / t for t in self.frame_times]
-        avg_fps = 1 / mean(self.frame_times)
-        median_fps = 1 / median(self.frame_times)
-        min_fps = 1 / max(self.frame_times)  # Slowest frame
-        max_fps = 1 / min(self.frame_times)  # Fastest frame
-
-        total_time = sum(self.frame_times)
+        frame_times = self.frame_times[:min(self.total_frames, self.capacity)]
+        avg_fps = 1 / frame_times.mean()
+        median_fps = 1 / np.median(frame_times)
+        min_fps = 1 / frame_times.max()  # Slowest frame
+        max_fps = 1 / frame_times.min()  # Fastest frame
 
         self.logger.info(
-            f"FPS Summary: {self.total_frames} frames in {total_time:.1f}s | "
+            f"FPS Summary: {self.total_frames} frames in {self.total_time:.1f}s | "
             f"Avg: {avg_fps:.1f} | Med: {median_fps:.1f} | "
             f"Min: {min_fps:.1f} | Max: {max_fps:.1f}"
         )
@@ -1,115 +1,302 @@
 import time
+from collections import deque
 import math
 import logging
+import queue
+import threading
 import cv2
 import numpy as np
 from light_level_detector import LightLevelDetector
 from detection_strategy import DetectionStrategy
 
+# Queue marker asking the detection worker to detect its partial batch
+_FLUSH = object()
+
+
+class FrameLog:
+    """
+    Per-frame timestamps and normalized boxes of a track.
+
+    Stored column-wise in float32 buffers that double when full, instead of a
+    dict per frame. Iterating yields the {'t': float, 'bbox': [x1,y1,x2,y2]}
+    dicts (rounded to 2 decimals) that are sent to the API.
+    """
+    __slots__ = ('t', 'bbox', 'size')
+
+    def __init__(self, capacity=64):
+        self.t = np.empty(capacity, dtype=np.float32)
+        self.bbox = np.empty((capacity, 4), dtype=np.float32)
+        self.size = 0
+
+    def append(self, t, bbox):
+        if self.size == len(self.t):
+            self.t = np.resize(self.t, 2 * self.size)
+            self.bbox = np.resize(self.bbox, (2 * self.size, 4))
+        self.t[self.size] = t
+        self.bbox[self.size] = bbox
+        self.size += 1
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        ts = self.t[:self.size].tolist()
+        boxes = self.bbox[:self.size].tolist()
+        for t, bbox in zip(ts, boxes):
+            yield {'t': round(t, 2), 'bbox': [round(b, 2) for b in bbox]}
+
+
 class FrameProcessor:
-    def __init__(self, detection_strategy: DetectionStrategy, save_images=False, tracker='bytetrack.yaml'):
+    def __init__(self, detection_strategy: DetectionStrategy, save_images=False, tracker='bytetrack.yaml', batch_size=1, batch_timeout=0.1, pipelined=False, light_ttl=5.0):
         self.save_images = save_images
         self.tracker = tracker
         self.logger = logging.getLogger(__name__)
         self.light_detector = LightLevelDetector()
+        # Lighting changes slowly, so a decision is reused for light_ttl seconds
+        self._light_ttl = light_ttl
+        self._light_ok = True
+        self._light_ok_until = 0.0
         
         self.strategy = detection_strategy
+
+        # Frames are buffered and detected together once batch_size frames are
+        # waiting or the oldest has waited batch_timeout seconds
+        self.batch_size = max(1, int(batch_size))
+        self.batch_timeout = batch_timeout
+        self._frame_buf = deque()
+
+        # Pipelined mode: submit() hands frames to a detection thread so capture
+        # overlaps detection. Track updates stay on the caller's thread.
+        self.pipelined = pipelined
+        self._worker = None
+        self._in_q = queue.Queue(maxsize=2)  # backpressure: at most 2 frames waiting
+        self._out_q = queue.Queue()
         
         self.logger.info('FrameProcessor initialized.')
         self.reset()
 
+        if pipelined:
+            self._worker = threading.Thread(target=self._detect_worker, name='detection', daemon=True)
+            self._worker.start()
+
     def run(self, img):
+        """
+        Detect on a frame synchronously (buffered until a batch is ready).
+
+        Returns True if the detected frames had valid detections.
+        """
+        frame = self._accept_frame(img)
+        if frame is None or not self._has_light(frame[1]):
+            return False
+
+        self._frame_buf.append(frame)
+        if not self._batch_ready():
+            return False
+        return self.flush()
+
+    def submit(self, img):
+        """
+        Queue a frame for the detection thread and apply any finished results.
+
+        Falls back to run() when not pipelined. Blocks while the detection
+        thread is two frames behind.
+
+        Returns True if the frames finished since the last call had valid detections.
+        """
+        if self._worker is None:
+            return self.run(img)
+
+        frame = self._accept_frame(img)
+        if frame is not None:
+            self._in_q.put(frame)
+        return self._apply_finished()
+
+    def flush(self):
+        """
+        Detect on all buffered frames and update tracks.
+
+        In pipelined mode this waits for the detection thread to finish every
+        submitted frame.
+
+        Returns True if any of the frames had valid detections.
+        """
+        if self._worker is not None:
+            self._in_q.put(_FLUSH)
+            return self._apply_finished(wait_for_flush=True)
+
+        if not self._frame_buf:
+            return False
+        return self._apply_results(*self._detect_buffered())
+
+    def _accept_frame(self, img):
+        """Validate and timestamp an incoming frame. Returns (cnt, img, frame_time) or None."""
         # incoming frame is BGR
         if img is None:
             self.logger.warning('Received None frame, skipping')
-            return False
+            return None
         
         if not isinstance(img, np.ndarray) or img.size == 0:
             self.logger.warning('Received invalid frame, skipping')
-            return False
+            return None
             
         self.cnt += 1
         
         # Capture frame timestamp BEFORE processing to account for detection latency
         frame_time = round(time.time() - self.start_time, 2)
+        return self.cnt, img, frame_time
 
-        # Check lighting condition first
-        if not self.light_detector.has_sufficient_light(img):
-            time.sleep(1)  # rate limiting when light is low
-            return False
+    def _has_light(self, img):
+        now = time.monotonic()
+        if now >= self._light_ok_until:
+            self._light_ok = self.light_detector.has_sufficient_light(img)
+            self._light_ok_until = now + self._light_ttl
+        return self._light_ok
+
+    def _batch_ready(self):
+        return (len(self._frame_buf) >= self.batch_size or
+                time.time() - self.start_time - self._frame_buf[0][2] >= self.batch_timeout)
+
+    def _detect_worker(self):
+        while True:
+            item = self._in_q.get()
+            try:
+                if item is _FLUSH:
+                    if self._frame_buf:
+                        self._out_q.put(self._detect_buffered())
+                    continue
+
+                # Check lighting condition first
+                if not self._has_light(item[1]):
+                    continue
+                self._frame_buf.append(item)
+                if self._batch_ready():
+                    self._out_q.put(self._detect_buffered())
+            except Exception as e:
+                # Keep the thread alive; the buffered frames count as having no detections
+                self.logger.error(f"Detection worker failed: {e}", exc_info=True)
+                batch = list(self._frame_buf)
+                self._frame_buf.clear()
+                self._out_q.put((batch, None))
+            finally:
+                if item is _FLUSH:
+                    self._out_q.put(_FLUSH)
+
+    def _detect_buffered(self):
+        """Detect on the buffered frames. Returns (batch, per-frame results or None on failure)."""
+        batch = list(self._frame_buf)
+        self._frame_buf.clear()
 
         # Detect
         st = time.time()
         
         try:
             # Strategy detect - Returns ONLY valid result objects
-            results = self.strategy.detect(img, self.tracker, min_confidence=0.1) # min_confidence could be config, leaving 0.1 default
+            # min_confidence could be config, leaving 0.1 default
+            if len(batch) == 1:
+                batch_results = [self.strategy.detect(batch[0][1], self.tracker, min_confidence=0.1)]
+            else:
+                batch_results = self.strategy.detect_batch(
+                    [img for _, img, _ in batch], self.tracker, min_confidence=0.1)
         except Exception as e:
             self.logger.error(f"Detection failed: {e}", exc_info=True)
-            return False
-        
-        if self.save_images and results:
+            return batch, None
+
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(
+                f'Detection Time: {(time.time() - st) * 1000:.0f} msec | '
+                f'Frames: {len(batch)}'
+            )
+        return batch, batch_results
+
+    def _apply_finished(self, wait_for_flush=False):
+        """Apply results the detection thread has finished, optionally waiting for a flush."""
+        has_detections = False
+        while True:
             try:
-                debug_img = img.copy()
-                h, w, _ = debug_img.shape
-                for res in results:
-                    x1, y1, x2, y2 = res.bbox
-                    # Denormalize
-                    x1, y1, x2, y2 = int(x1*w), int(y1*h), int(x2*w), int(y2*h)
-                    cv2.rectangle(debug_img, (x1, y1), (x2, y2), (0, 255, 0), 2)
-                    cv2.putText(debug_img, f"{res.class_name} {res.confidence:.2f}", (x1, y1 - 10), 
-                               cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
-                cv2.imwrite(f'data/test/frame{str(self.cnt)}.jpg', debug_img)
-            except Exception as e:
-                self.logger.warning(f"Failed to save debug image: {e}")
+                item = self._out_q.get(block=wait_for_flush)
+            except queue.Empty:
+                return has_detections
+            if item is _FLUSH:
+                return has_detections
+            has_detections |= self._apply_results(*item)
 
-        if not results:
-            self.logger.debug('No detections')
+    def _apply_results(self, batch, batch_results):
+        if batch_results is None:
             return False
 
-        # Update tracks with valid detections
-        for res in results:
-            self.update_track(res.track_id, res.class_name, res.confidence, res.bbox, frame_time, res.crop, res.blur_variance)
+        valid = 0
+        for (cnt, img, frame_time), results in zip(batch, batch_results):
+            if self.save_images and results:
+                self.save_debug_image(img, results, cnt)
+
+            if not results:
+                continue
 
-        self.logger.debug(
-            f'Detection Time: {(time.time() - st) * 1000:.0f} msec | '
-            f'Valid: {len(results)}'
-        )
+            # Update tracks with valid detections
+            for res in results:
+                self.update_track(res.track_id, res.class_name, res.confidence, res.bbox, frame_time, res.crop, res.blur_variance)
+            valid += len(results)
 
-        return len(results) > 0
+        if not valid:
+            self.logger.debug('No detections')
+            return False
+
+        self.logger.debug(f'Frames: {len(batch)} | Valid: {valid}')
+        return True
+
+    def save_debug_image(self, img, results, cnt):
+        try:
+            debug_img = img.copy()
+            h, w, _ = debug_img.shape
+            for res in results:
+                x1, y1, x2, y2 = res.bbox
+                # Denormalize
+                x1, y1, x2, y2 = int(x1*w), int(y1*h), int(x2*w), int(y2*h)
+                cv2.rectangle(debug_img, (x1, y1), (x2, y2), (0, 255, 0), 2)
+                cv2.putText(debug_img, f"{res.class_name} {res.confidence:.2f}", (x1, y1 - 10), 
+                           cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
+            cv2.imwrite(f'data/test/frame{str(cnt)}.jpg', debug_img)
+        except Exception as e:
+            self.logger.warning(f"Failed to save debug image: {e}")
 
     def update_track(self, track_id, class_name, confidence, bbox, frame_time, crop=None, blur_variance=None):
-        if track_id not in self.tracks:
-            self.tracks[track_id] = {
+        track = self.tracks.get(track_id)
+        if track is None:
+            track = self.tracks[track_id] = {
                 'start_time': frame_time,
                 'preds': [],
                 'best_frame': None,
                 'best_frame_score': 0.0,
-                'frames': []  # List of {t: float, bbox: [x1,y1,x2,y2]}
+                'frames': FrameLog()  # Per-frame time and bbox
             }
         # Only append real predictions (None means not classified this frame)
         if class_name is not None:
-            self.tracks[track_id]['preds'].append((class_name, confidence))
-        self.tracks[track_id]['end_time'] = frame_time
+            track['preds'].append((class_name, confidence))
+        track['end_time'] = frame_time
         
         # Store frame bbox for track visualization
-        self.tracks[track_id]['frames'].append({
-            't': frame_time,
-            'bbox': [round(float(b), 2) for b in bbox]
-        })
+        track['frames'].append(frame_time, bbox)
         
         # Update best frame using combined score: sharpness + size
-        # Log-space addition balances blur variance and pixel count regardless of scale
+        # (b+1)^1.5 * (p+1) ranks frames exactly like the log-space sum
+        # 1.5*log(b+1) + log(p+1), which balances blur variance and pixel count
+        # regardless of scale, without computing any logarithms
         if crop is not None and blur_variance is not None:
             pixel_count = crop.shape[0] * crop.shape[1]
             # 1.5x weight on blur to prioritize sharpness over size
-            frame_score = 1.5 * math.log(blur_variance + 1) + math.log(pixel_count + 1)
-            if frame_score > self.tracks[track_id]['best_frame_score']:
-                self.tracks[track_id]['best_frame'] = crop
-                self.tracks[track_id]['best_frame_score'] = frame_score
+            blur_term = blur_variance + 1
+            frame_score = blur_term * math.sqrt(blur_term) * (pixel_count + 1)
+            if frame_score > track['best_frame_score']:
+                track['best_frame'] = crop
+                track['best_frame_score'] = frame_score
 
     def reset(self):
+        if self._worker is not None:
+            # Let the detection thread go idle before clearing state it shares
+            self.flush()
         self.tracks = {}
+        self._frame_buf.clear()
+        self._light_ok_until = 0.0
         if self.strategy:
             self.strategy.reset()
         self.start_time = time.time()
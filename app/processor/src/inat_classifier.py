@@ -12,7 +12,9 @@ Installation: pip install birder
 """
 
 import logging
+import os
 from typing import Optional, Tuple, List, Dict
+import cv2
 import numpy as np
 
 logger = logging.getLogger(__name__)
@@ -20,7 +22,6 @@ logger = logging.getLogger(__name__)
 # Try to import birder, provide helpful error if not installed
 try:
     import birder
-    from birder.inference.classification import infer_image
     BIRDER_AVAILABLE = True
 except ImportError:
     BIRDER_AVAILABLE = False
@@ -29,6 +30,9 @@ except ImportError:
         "This is required for global bird species classification (including Australian birds)."
     )
 
+# CPU inference threads: leave one core for frame capture, audio and the heartbeat thread
+INFERENCE_THREADS = max(1, (os.cpu_count() or 1) - 1)
+
 
 class INatClassifier:
     """
@@ -69,11 +73,17 @@ class INatClassifier:
         "Passer domesticus": "House Sparrow",
     }
     
+    PRECISIONS = ("fp32", "int8")
+
+    # Largest crop batch per forward pass
+    MAX_BATCH = 8
+
     def __init__(
         self, 
         model_name: str = "rope_vit_reg4_b14_capi-inat21-224px",
         bird_only: bool = True,
-        regional_species: Optional[List[str]] = None
+        regional_species: Optional[List[str]] = None,
+        precision: str = "fp32"
     ):
         """
         Initialize the iNaturalist classifier.
@@ -84,13 +94,20 @@ class INatClassifier:
                 - "rope_vit_reg4_b14_capi-inat21-224px" (224x224, faster)
             bird_only: If True, only return bird classifications (class "Aves")
             regional_species: Optional list of species/families to filter for
+            precision: "fp32" or "int8" (dynamic per-channel quantization of the
+                ViT linear layers, falls back to fp32 if unsupported)
         """
+        if precision not in self.PRECISIONS:
+            raise ValueError(f"precision must be one of {self.PRECISIONS}, got: {precision}")
+
         self.model_name = model_name
         self.bird_only = bird_only
         self.regional_species = regional_species
+        self.precision = precision
         self.net = None
         self.model_info = None
         self.transform = None
+        self._tensor_transform = False  # transform accepts uint8 CHW tensors, skipping PIL
         self.size = None
         
         if not BIRDER_AVAILABLE:
@@ -109,11 +126,17 @@ class INatClassifier:
                 self.model_name, 
                 inference=True
             )
+            self._build_class_tables(self.model_info.class_to_idx)
+            if self.precision == "int8":
+                self.net = self._quantize_int8(self.net)
             self.size = birder.get_size_from_signature(self.model_info.signature)
             self.transform = birder.classification_transform(
                 self.size, 
                 self.model_info.rgb_stats
             )
+            self._tensor_transform = self._accepts_tensors(self.transform)
+            import torch
+            torch.set_num_threads(INFERENCE_THREADS)
             logger.info(
                 f"iNaturalist classifier loaded: {self.model_name} "
                 f"(input size: {self.size}x{self.size})"
@@ -122,6 +145,44 @@ class INatClassifier:
             logger.error(f"Failed to load iNaturalist model: {e}")
             raise
     
+    def _quantize_int8(self, net):
+        """
+        Post-training dynamic INT8 quantization of the ViT's linear layers.
+
+        Weights are quantized per channel ahead of time and activations at
+        runtime, so no calibration set is needed. Returns the original network
+        if the quantization backend is unavailable on this platform.
+        """
+        try:
+            import torch
+            from torch.ao.quantization import quantize_dynamic
+            quantized = quantize_dynamic(net, {torch.nn.Linear}, dtype=torch.qint8)
+            logger.info(f"iNaturalist classifier quantized to INT8: {self.model_name}")
+            return quantized
+        except Exception as e:
+            logger.warning(f"INT8 quantization unavailable, using full precision: {e}")
+            return net
+
+    @staticmethod
+    def _accepts_tensors(transform) -> bool:
+        """Birder's inference preset is a torchvision v2 pipeline, which also runs on tensors."""
+        try:
+            from torchvision.transforms import v2
+        except ImportError:
+            return False
+        return isinstance(transform, v2.Transform)
+
+    def _preprocess(self, crop: np.ndarray) -> np.ndarray:
+        """BGR crop -> (1, 3, size, size) float32 model input."""
+        # cvtColor writes a contiguous RGB buffer, so neither path below copies it again
+        rgb = cv2.cvtColor(crop, cv2.COLOR_BGR2RGB)
+        if self._tensor_transform:
+            # Resize and normalize with torch kernels on the uint8 tensor (PILToTensor is a no-op)
+            import torch
+            return self.transform(torch.from_numpy(rgb).permute(2, 0, 1)).unsqueeze(0).numpy()
+        from PIL import Image
+        return self.transform(Image.fromarray(rgb)).unsqueeze(0).numpy()
+
     def _get_common_name(self, scientific_name: str) -> str:
         """
         Convert scientific name to common name if available.
@@ -152,6 +213,32 @@ class INatClassifier:
         # iNaturalist class names include taxonomy: "Aves/..." or start with bird families
         return class_name.startswith("Aves") or "_Aves_" in class_name
     
+    def _build_class_tables(self, class_to_idx: Dict[str, int]):
+        """
+        Build the per-class lookups used by classify(), indexed by class id.
+        
+        Names are parsed once here so classification only indexes into
+        _idx_to_class, _display_name_by_idx and the _is_bird_idx and
+        _regional_mask masks (the latter None without regional_species).
+        """
+        num_classes = max(class_to_idx.values(), default=-1) + 1
+        idx_to_class = [None] * num_classes
+        display_names = [None] * num_classes
+        self._is_bird_idx = np.zeros(num_classes, dtype=bool)
+        regional = [rs.lower() for rs in self.regional_species or []]
+        self._regional_mask = np.zeros(num_classes, dtype=bool) if regional else None
+        for name, idx in class_to_idx.items():
+            idx_to_class[idx] = name
+            display_names[idx] = self._get_common_name(name)
+            self._is_bird_idx[idx] = self._is_bird_class(name)
+            if regional:
+                name_lower, display_lower = name.lower(), display_names[idx].lower()
+                self._regional_mask[idx] = any(rs in display_lower or rs in name_lower for rs in regional)
+        self._idx_to_class = tuple(idx_to_class)
+        self._display_name_by_idx = tuple(display_names)
+        # All four together, so _predictions() resolves them with one attribute lookup
+        self._class_table = (self._idx_to_class, self._display_name_by_idx, self._is_bird_idx, self._regional_mask)
+    
     def classify(self, crop: np.ndarray) -> Tuple[Optional[str], float, dict]:
         """
         Classify a bird crop using the iNaturalist model.
@@ -165,102 +252,112 @@ class INatClassifier:
             - confidence: Confidence score (0.0 to 1.0)
             - metadata: Dict with additional info (scientific_name, top_predictions)
         """
-        if crop is None or crop.size == 0:
-            return None, 0.0, {}
-        
-        try:
-            # Convert BGR to RGB (birder expects RGB)
-            from PIL import Image
-            rgb_crop = crop[:, :, ::-1]  # BGR to RGB
-            pil_image = Image.fromarray(rgb_crop)
-            
-            # Run inference
-            out, embedding = infer_image(
-                self.net, 
-                pil_image, 
-                self.transform,
-                return_embedding=True
-            )
-            
-            # out shape: (1, 10000) - probabilities for each class
-            probs = out[0]
-            
-            # Get top predictions
-            top_k = 5
-            top_indices = np.argsort(probs)[::-1][:top_k]
-            
-            # Get class names from model
-            class_names = self.model_info.class_to_idx
-            idx_to_class = {v: k for k, v in class_names.items()}
-            
-            top_predictions = []
-            for idx in top_indices:
-                if idx in idx_to_class:
-                    scientific_name = idx_to_class[idx]
-                    common_name = self._get_common_name(scientific_name)
-                    conf = float(probs[idx])
-                    top_predictions.append({
-                        "scientific_name": scientific_name,
-                        "common_name": common_name,
-                        "confidence": conf
-                    })
-            
-            # Filter for birds if bird_only is enabled
-            if self.bird_only:
-                bird_predictions = [
-                    p for p in top_predictions 
-                    if self._is_bird_class(p["scientific_name"])
-                ]
-                if bird_predictions:
-                    top_predictions = bird_predictions
-            
-            # Filter for regional species if configured
-            if self.regional_species:
-                filtered = []
-                for pred in top_predictions:
-                    name_lower = pred["common_name"].lower()
-                    sci_lower = pred["scientific_name"].lower()
-                    for rs in self.regional_species:
-                        rs_lower = rs.lower()
-                        if rs_lower in name_lower or rs_lower in sci_lower:
-                            filtered.append(pred)
-                            break
-                if filtered:
-                    top_predictions = filtered
-            
-            if not top_predictions:
-                return None, 0.0, {"top_predictions": []}
-            
-            best = top_predictions[0]
-            
-            # Log results
-            top3_str = ", ".join([
-                f"{p['common_name']}:{p['confidence']:.1%}" 
-                for p in top_predictions[:3]
-            ])
-            logger.info(
-                f"iNat classification: {best['common_name']} ({best['confidence']:.1%}) | "
-                f"Top 3: [{top3_str}]"
-            )
-            
-            return (
-                best["common_name"],
-                best["confidence"],
-                {
-                    "scientific_name": best["scientific_name"],
-                    "top_predictions": top_predictions
-                }
-            )
+        return self.classify_batch([crop])[0]
+
+    def classify_batch(self, crops: List[np.ndarray]) -> List[Tuple[Optional[str], float, dict]]:
+        """
+        Classify several bird crops with one forward pass per MAX_BATCH crops.
+
+        Args:
+            crops: BGR image crops, e.g. every bird tracked in the current frame
             
-        except Exception as e:
-            logger.error(f"iNaturalist classification failed: {e}", exc_info=True)
-            return None, 0.0, {"error": str(e)}
+        Returns:
+            One (species_name, confidence, metadata) tuple per crop, as classify()
+        """
+        results: List[Tuple[Optional[str], float, dict]] = [(None, 0.0, {})] * len(crops)
+        valid = [i for i, crop in enumerate(crops) if crop is not None and crop.size > 0]
+        
+        for start in range(0, len(valid), self.MAX_BATCH):
+            chunk = valid[start:start + self.MAX_BATCH]
+            try:
+                probs = self._class_probs([crops[i] for i in chunk])
+                for i, crop_probs in zip(chunk, probs):
+                    results[i] = self._predictions(crop_probs)
+            except Exception as e:
+                logger.error(f"iNaturalist classification failed: {e}", exc_info=True)
+                for i in chunk:
+                    results[i] = (None, 0.0, {"error": str(e)})
+        return results
 
+    def _class_probs(self, crops: List[np.ndarray]) -> np.ndarray:
+        """Run one forward pass over the crops. Returns (N, num_classes) probabilities."""
+        import torch
+        batch = np.concatenate([self._preprocess(crop) for crop in crops])
+        device = next(self.net.parameters()).device
+        inputs = torch.from_numpy(batch)
+        if device.type == "cuda":
+            # Pinned staging memory lets the host-to-device copy run asynchronously
+            inputs = inputs.pin_memory().to(device, non_blocking=True)
+        with torch.inference_mode():
+            # forward() returns only the logits; no callers use the embedding,
+            # so it is neither computed separately nor copied to the host
+            logits = self.net(inputs).float().cpu().numpy()
+        # Softmax over classes, as Birder's infer_image applies to the logits
+        exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+        return exp / exp.sum(axis=1, keepdims=True)
+
+    def _predictions(self, probs: np.ndarray) -> Tuple[Optional[str], float, dict]:
+        """Turn one crop's class probabilities into (species_name, confidence, metadata)."""
+        # Get top predictions
+        top_k = min(5, len(probs))
+        # Partition out the top k, then sort only those
+        part = np.argpartition(probs, -top_k)[-top_k:]
+        top_indices = part[np.argsort(probs[part])[::-1]]
+        
+        idx_to_class, display_names, is_bird_idx, regional_mask = self._class_table
+        top_indices = top_indices[top_indices < len(idx_to_class)]
+        
+        # Filter for birds if bird_only is enabled
+        if self.bird_only:
+            bird_indices = top_indices[is_bird_idx[top_indices]]
+            if len(bird_indices):
+                top_indices = bird_indices
+        
+        # Filter for regional species if configured
+        if regional_mask is not None:
+            regional_indices = top_indices[regional_mask[top_indices]]
+            if len(regional_indices):
+                top_indices = regional_indices
+        
+        top_predictions = []
+        for idx in top_indices:
+            scientific_name = idx_to_class[idx]
+            if scientific_name is not None:
+                top_predictions.append({
+                    "scientific_name": scientific_name,
+                    "common_name": display_names[idx],
+                    "confidence": float(probs[idx])
+                })
+        
+        if not top_predictions:
+            return None, 0.0, {"top_predictions": []}
+        
+        best = top_predictions[0]
+        
+        # Log results
+        top3_str = ", ".join([
+            f"{p['common_name']}:{p['confidence']:.1%}" 
+            for p in top_predictions[:3]
+        ])
+        logger.info(
+            f"iNat classification: {best['common_name']} ({best['confidence']:.1%}) | "
+            f"Top 3: [{top3_str}]"
+        )
+        
+        return (
+            best["common_name"],
+            best["confidence"],
+            {
+                "scientific_name": best["scientific_name"],
+                "top_predictions": top_predictions
+            }
+        )
 
 def create_inat_classifier(
     model_name: str = "rope_vit_reg4_b14_capi-inat21-224px",
     bird_only: bool = True,
-    regional_species: Optional[List[str]] = None
+    regional_species: Optional[List[str]] = None,
+    precision: str = "fp32"
 ) -> Optional[INatClassifier]:
     """
     Factory function to create an iNaturalist classifier.
@@ -278,7 +375,8 @@ def create_inat_classifier(
         return INatClassifier(
             model_name=model_name,
             bird_only=bird_only,
-            regional_species=regional_species
+            regional_species=regional_species,
+            precision=precision
         )
     except Exception as e:
         logger.error(f"Failed to create iNaturalist classifier: {e}")
@@ -2,20 +2,36 @@
 LLM-based plausibility verification for bird detections using Google Gemini.
 """
 
-import json
 import logging
 import os
-from datetime import datetime
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 from typing import List
 
 import cv2
 import numpy as np
 from google import genai
 from google.genai import types
+import orjson
 from pydantic import BaseModel, Field
 
 logger = logging.getLogger(__name__)
 
+# Concurrent Gemini requests when validating the detections of one recording
+MAX_CONCURRENT_REQUESTS = 4
+
+# Gemini downscales images to ~768px tiles itself, so larger uploads add nothing
+MAX_UPLOAD_SIDE = 768
+
+# PyTurboJPEG is optional: it needs the libturbojpeg system library, cv2.imencode is the fallback
+try:
+    from turbojpeg import TurboJPEG, TJPF_BGR
+    TURBOJPEG_AVAILABLE = True
+except ImportError:
+    TURBOJPEG_AVAILABLE = False
+
 PROMPT = """You are verifying a bird detection from a feeder camera.
 The ML model detected: "{detected_species}"
 Observation time: {datetime}
@@ -51,34 +67,57 @@ class LLMVerifier:
     ):
         self.client = genai.Client(api_key=api_key)
         self.log_dir = log_dir
+        self._log_folder = None  # last date folder created under log_dir
         self.model = model
         self.latitude = latitude
         self.longitude = longitude
+        # The location and response schema are fixed, so fill them in once
+        lat_str = str(latitude) if latitude is not None else 'Unknown'
+        lon_str = str(longitude) if longitude is not None else 'Unknown'
+        self._prompt_template = PROMPT.replace('{latitude}', lat_str).replace('{longitude}', lon_str)
+        self._generate_config = types.GenerateContentConfig(
+            response_mime_type="application/json",
+            response_schema=VerificationResult
+        )
         self.min_confidence = min_confidence
+        self._jpeg = None
+        if TURBOJPEG_AVAILABLE:
+            try:
+                self._jpeg = TurboJPEG()
+            except (OSError, RuntimeError) as e:
+                logger.warning(f"libturbojpeg not usable, falling back to cv2 JPEG encoding: {e}")
         
         # Rate limiting
         self.max_calls_per_hour = max_calls_per_hour
         self.max_calls_per_day = max_calls_per_day
         self.calls_this_hour = 0
         self.calls_this_day = 0
-        self.hour_reset_time = datetime.now()
-        self.day_reset_date = datetime.now().date()
+        # Monotonic hour window; the day resets at local midnight, kept as a timestamp
+        self.hour_reset_time = time.monotonic()
+        self.day_reset_at = self._next_midnight()
+        self._limits_lock = threading.Lock()
         
         logger.info(f"LLMVerifier initialized (model: {model}, min_conf: {min_confidence}, limits: {max_calls_per_hour}/hour, {max_calls_per_day}/day)")
     
+    @staticmethod
+    def _next_midnight() -> float:
+        """Timestamp of the next local midnight."""
+        tomorrow = datetime.now().date() + timedelta(days=1)
+        return datetime.combine(tomorrow, datetime.min.time()).timestamp()
+    
     def _check_and_reset_limits(self):
         """Reset counters if hour/day has passed."""
-        now = datetime.now()
+        now = time.monotonic()
         
         # Reset hourly counter
-        if (now - self.hour_reset_time).total_seconds() >= 3600:
+        if now - self.hour_reset_time >= 3600:
             self.calls_this_hour = 0
             self.hour_reset_time = now
         
         # Reset daily counter
-        if now.date() > self.day_reset_date:
+        if time.time() >= self.day_reset_at:
             self.calls_this_day = 0
-            self.day_reset_date = now.date()
+            self.day_reset_at = self._next_midnight()
     
     def _is_rate_limited(self) -> bool:
         """Check if we've exceeded rate limits."""
@@ -94,96 +133,152 @@ class LLMVerifier:
             return False
         return True
     
-    def verify(self, crop: np.ndarray, detected_species: str, observation_time: datetime = None) -> dict:
-        """Verify if detection is plausible."""
+    def _count_call(self):
+        with self._limits_lock:
+            self.calls_this_hour += 1
+            self.calls_this_day += 1
+    
+    def _encode_jpeg(self, crop: np.ndarray):
+        """Encode a BGR crop as JPEG bytes (longest side at most MAX_UPLOAD_SIDE), or None on failure."""
+        h, w = crop.shape[:2]
+        longest = max(h, w)
+        if longest > MAX_UPLOAD_SIDE:
+            scale = MAX_UPLOAD_SIDE / longest
+            crop = cv2.resize(crop, (max(1, int(w * scale)), max(1, int(h * scale))),
+                              interpolation=cv2.INTER_AREA)
+        if self._jpeg is not None:
+            return self._jpeg.encode(np.ascontiguousarray(crop), quality=85, pixel_format=TJPF_BGR)
+        success, buffer = cv2.imencode('.jpg', crop, [cv2.IMWRITE_JPEG_QUALITY, 85])
+        return buffer.tobytes() if success else None
+    
+    @staticmethod
+    def _invalid_input(crop: np.ndarray, detected_species: str):
+        """Result for inputs that can't be verified, or None if they are valid."""
         if crop is None or crop.size == 0:
             return {'is_plausible': False, 'reasoning': 'Empty image'}
         
         # Validate species name
         if not detected_species or not isinstance(detected_species, str):
             return {'is_plausible': False, 'reasoning': 'Invalid species name'}
+        return None
+    
+    def verify(self, crop: np.ndarray, detected_species: str, observation_time: datetime = None) -> dict:
+        """Verify if detection is plausible."""
+        invalid = self._invalid_input(crop, detected_species)
+        if invalid is not None:
+            return invalid
         
         # Increment rate limit counters
-        self.calls_this_hour += 1
-        self.calls_this_day += 1
+        self._count_call()
+        return self._request_verification(crop, detected_species, observation_time)[0]
+    
+    def _request_verification(self, crop: np.ndarray, detected_species: str, observation_time: datetime = None):
+        """
+        Send one verification request to Gemini. Rate limits are counted by the caller.
         
+        Returns (result, jpeg_bytes); jpeg_bytes is the uploaded image, or None if encoding failed.
+        """
+        image_bytes = None
         try:
             # Validate image can be encoded
-            success, buffer = cv2.imencode('.jpg', crop, [cv2.IMWRITE_JPEG_QUALITY, 85])
-            if not success:
+            image_bytes = self._encode_jpeg(crop)
+            if image_bytes is None:
                 logger.error("Failed to encode image")
-                return {'is_plausible': True, 'reasoning': 'Image encoding failed'}
+                return {'is_plausible': True, 'reasoning': 'Image encoding failed'}, None
             
             # Format datetime for the prompt
             dt_str = observation_time.strftime('%Y-%m-%d %H:%M') if observation_time else 'Unknown'
-            lat_str = str(self.latitude) if self.latitude is not None else 'Unknown'
-            lon_str = str(self.longitude) if self.longitude is not None else 'Unknown'
-            
-            prompt = PROMPT.format(
-                detected_species=detected_species,
-                datetime=dt_str,
-                latitude=lat_str,
-                longitude=lon_str
-            )
+            prompt = self._prompt_template.format(detected_species=detected_species, datetime=dt_str)
             
             response = self.client.models.generate_content(
                 model=self.model,
                 contents=[types.Content(role="user", parts=[
-                    types.Part.from_bytes(data=buffer.tobytes(), mime_type="image/jpeg"),
+                    types.Part.from_bytes(data=image_bytes, mime_type="image/jpeg"),
                     types.Part.from_text(text=prompt)
                 ])],
-                config=types.GenerateContentConfig(
-                    response_mime_type="application/json",
-                    response_schema=VerificationResult
-                )
+                config=self._generate_config
             )
             
+            # pydantic's Rust JSON parser validates in one pass; no separate loads needed
             parsed = VerificationResult.model_validate_json(response.text)
             result = {'is_plausible': parsed.is_plausible, 'reasoning': parsed.reasoning}
             logger.info(f"LLM: plausible={result['is_plausible']} - {result['reasoning']}")
-            return result
+            return result, image_bytes
             
         except Exception as e:
             logger.error(f"LLM verification failed: {e}")
             # Default to accepting detection on error to avoid false negatives
-            return {'is_plausible': True, 'reasoning': f'Error: {str(e)[:100]}'}
+            return {'is_plausible': True, 'reasoning': f'Error: {str(e)[:100]}'}, image_bytes
     
-    def _save_log(self, track_id: int, crop: np.ndarray, detection: dict, result: dict):
-        """Save verification to persistent log folder organized by year/month/day."""
+    def _save_log(self, track_id: int, crop: np.ndarray, detection: dict, result: dict, image_bytes: bytes = None):
+        """
+        Save verification to persistent log folder organized by year/month/day.
+        
+        image_bytes, the JPEG sent to Gemini, is written as is; otherwise the crop is encoded.
+        """
         if not self.log_dir:
             return
         
         now = datetime.now()
-        # Create year/month/day folder structure
+        # Create year/month/day folder structure, once per day
         date_folder = os.path.join(self.log_dir, now.strftime('%Y'), now.strftime('%m'), now.strftime('%d'))
-        os.makedirs(date_folder, exist_ok=True)
+        if date_folder != self._log_folder:
+            os.makedirs(date_folder, exist_ok=True)
+            self._log_folder = date_folder
         
         timestamp = now.strftime('%H%M%S')
         log_path = os.path.join(date_folder, f'{timestamp}_track{track_id}')
         
-        cv2.imwrite(f'{log_path}.jpg', crop)
-        with open(f'{log_path}.json', 'w') as f:
-            json.dump({
-                'species': detection.get('species_name'),
-                'confidence': detection.get('confidence'),
-                'llm_result': result
-            }, f, indent=2)
+        if image_bytes is not None:
+            with open(f'{log_path}.jpg', 'wb') as f:
+                f.write(image_bytes)
+        else:
+            cv2.imwrite(f'{log_path}.jpg', crop)
+        payload = {
+            'species': detection.get('species_name'),
+            'confidence': detection.get('confidence'),
+            'llm_result': result
+        }
+        # orjson writes straight to bytes and handles numpy scalars
+        with open(f'{log_path}.json', 'wb') as f:
+            f.write(orjson.dumps(payload, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
     
     def validate_detections(self, detections: List[dict], observation_time: datetime = None) -> List[dict]:
         """Validate detections, returns only plausible ones."""
-        validated = []
-        for det in detections:
+        # Decide serially which detections to verify so each one is counted
+        # against the rate limits before any request is sent
+        to_verify, results, images = [], {}, {}
+        for i, det in enumerate(detections):
             # Skip LLM verification for squirrels
             if det.get('species_name') == 'Squirrel':
-                validated.append(det)
                 continue
-            
             if not self.should_verify(det['confidence']) or det.get('best_frame') is None:
+                continue
+            invalid = self._invalid_input(det['best_frame'], det['species_name'])
+            if invalid is not None:
+                results[i] = invalid
+                continue
+            self._count_call()
+            to_verify.append(i)
+        
+        if to_verify:
+            # Requests are network-bound, so they run concurrently
+            with ThreadPoolExecutor(max_workers=min(len(to_verify), MAX_CONCURRENT_REQUESTS)) as executor:
+                futures = {
+                    i: executor.submit(self._request_verification, detections[i]['best_frame'],
+                                       detections[i]['species_name'], observation_time)
+                    for i in to_verify
+                }
+                for i, future in futures.items():
+                    results[i], images[i] = future.result()
+        
+        validated = []
+        for i, det in enumerate(detections):
+            result = results.get(i)
+            if result is None:
                 validated.append(det)
                 continue
-            
-            result = self.verify(det['best_frame'], det['species_name'], observation_time)
-            self._save_log(det.get('track_id', 0), det['best_frame'], det, result)
+            self._save_log(det.get('track_id', 0), det['best_frame'], det, result, images.get(i))
             
             if result['is_plausible']:
                 validated.append(det)
@@ -1,11 +1,14 @@
 import warnings
 import threading
+from concurrent.futures import ThreadPoolExecutor
 import time
 from datetime import datetime, timezone
 import argparse
 import logging
 import os
+import random
 import shutil
+import signal
 
 # Suppress NumPy subnormal warning on ARM platforms (Raspberry Pi)
 warnings.filterwarnings("ignore", message="The value of the smallest subnormal")
@@ -18,6 +21,7 @@ from fps_tracker import FPSTracker
 from api import API
 from sources.media_source import MediaSource
 from sources.video_file_source import VideoFileSource
+from sources.frame_prefetcher import FramePrefetcher
 from audio_processor import AudioProcessor
 from llm_verifier import LLMVerifier
 from app_config.app_config import app_config
@@ -32,9 +36,39 @@ logging.basicConfig(
 )
 
 
+class _WithoutFrames:
+    """Formats detections without their best_frame arrays, only when the log record is emitted."""
+
+    def __init__(self, detections):
+        self.detections = detections
+
+    def __str__(self):
+        return str([{k: v for k, v in d.items() if k != 'best_frame'} for d in self.detections])
+
+
+def _utc(ns):
+    return datetime.fromtimestamp(ns / 1e9, tz=timezone.utc)
+
+
+_day_dir = None  # last data/recordings/YYYY/MM/DD created by get_output_path
+
+
 def get_output_path():
-    output_dir = "data/recordings/" + time.strftime("%Y/%m/%d/%H%M%S")
-    os.makedirs(output_dir, exist_ok=True)
+    global _day_dir
+    now = time.localtime()
+    day_dir = "data/recordings/" + time.strftime("%Y/%m/%d", now)
+    output_dir = day_dir + time.strftime("/%H%M%S", now)
+    # Walk the day's parent directories only once per day
+    if day_dir != _day_dir:
+        os.makedirs(day_dir, exist_ok=True)
+        _day_dir = day_dir
+    try:
+        os.mkdir(output_dir)
+    except FileExistsError:
+        pass
+    except FileNotFoundError:
+        # Day folder removed since it was created (e.g. cleanup)
+        os.makedirs(output_dir, exist_ok=True)
     return output_dir
 
 
@@ -51,14 +85,46 @@ def heartbeat():
             retry_delay = 1  # Reset delay on success
             time.sleep(60)
         except Exception as e:
-            logging.error(f"Heartbeat failed: {e}. Retrying in {retry_delay}s...")
+            logging.error(f"Heartbeat failed: {e}. Retrying in {retry_delay:.0f}s...")
             time.sleep(retry_delay)
-            # Exponential backoff with cap
-            retry_delay = min(retry_delay * 2, max_retry_delay)
+            # Decorrelated jitter backoff with cap, so feeders that lost the
+            # network together don't retry in lockstep
+            retry_delay = min(max_retry_delay, random.uniform(1, retry_delay * 3))
+
+
+def load_regional_species(api, audio_enabled):
+    """Create the audio processor (if enabled) and register the active species. Returns (audio_processor, regional_species)."""
+    audio_processor = None
+    regional_species = []  # Empty list signals "use all species from included_bird_families config"
+    if audio_enabled:
+        audio_processor = AudioProcessor(lat=app_config.get(
+            'secrets.latitude'), lon=app_config.get('secrets.longitude'), spectrogram_px_per_sec=app_config.get('processor.spectrogram_px_per_sec'))
+        regional_species = audio_processor.get_regional_species() + ["Squirrel"]
+    return audio_processor, api.set_active_species(regional_species)
+
+
+def create_llm_verifier():
+    """LLMVerifier if a Gemini API key is configured, else None."""
+    gemini_api_key = app_config.get('ai.gemini_api_key')
+    if not gemini_api_key:
+        return None
+    return LLMVerifier(
+        api_key=gemini_api_key,
+        model=app_config.get('ai.model'),
+        min_confidence=app_config.get('ai.llm_verification.min_confidence'),
+        max_calls_per_hour=app_config.get('ai.llm_verification.max_calls_per_hour'),
+        max_calls_per_day=app_config.get('ai.llm_verification.max_calls_per_day'),
+        latitude=app_config.get('secrets.latitude'),
+        longitude=app_config.get('secrets.longitude'),
+        log_dir=os.path.join('data', 'llm_verification_logs'),
+    )
 
 
 def main():
-    heartbeat_thread = threading.Thread(target=heartbeat, daemon=True)
+    # A plain sleeping thread: the main thread blocks in motion detection, so a
+    # sched/asyncio timer would need a thread of its own anyway, and time.sleep
+    # holds no GIL between the once-a-minute posts
+    heartbeat_thread = threading.Thread(target=heartbeat, name='heartbeat', daemon=True)
     heartbeat_thread.start()
 
     parser = argparse.ArgumentParser(description="Smart bird feeder program")
@@ -75,21 +141,38 @@ def main():
     
     # Instantiate all helper classes
     api = API()
+    # Set by SIGTERM; the loops below check it and exit through their normal cleanup
+    shutdown = threading.Event()
     if args.fake_motion:
         motion = args.fake_motion.lower() == 'true'
         motion_detector = FakeMotionDetector(motion=motion, wait=10)
+
+        def handle_sigterm(signum, frame):
+            # Let `docker stop` end the simulated wait instead of waiting it out
+            shutdown.set()
+            motion_detector.stop()
+        signal.signal(signal.SIGTERM, handle_sigterm)
         logging.info(f"Motion Detector: FakeMotionDetector (motion={motion})")
     else:
         motion_detector = PIRMotionDetector()
         logging.info("Motion Detector: PIRMotionDetector")
         
-    decision_maker = DecisionMaker(max_record_seconds=app_config.get(
-        'processor.max_record_seconds'), max_inactive_seconds=app_config.get('processor.max_inactive_seconds'))
+    max_record_seconds = app_config.get('processor.max_record_seconds')
+    max_inactive_seconds = app_config.get('processor.max_inactive_seconds')
+    decision_maker = DecisionMaker(max_record_seconds=max_record_seconds, max_inactive_seconds=max_inactive_seconds)
     main_size = (app_config.get('camera.video_width'),
                  app_config.get('camera.video_height'))
     camera_config = app_config.get('camera')
     media_source = MediaSource(main_size=main_size, camera_config=camera_config) if not args.input else VideoFileSource(
         args.input, main_size=main_size)
+
+    # The regional species lookup (BirdNET model + API call) and the Gemini client are
+    # independent, so they initialize together. Started after MediaSource forks its
+    # camera process, so the fork doesn't copy threads holding locks
+    audio_enabled = app_config.get('processor.enable_audio_processing')
+    startup = ThreadPoolExecutor(max_workers=2)
+    species_future = startup.submit(load_regional_species, api, audio_enabled)
+    llm_future = startup.submit(create_llm_verifier)
     
     # Log camera configuration
     logging.info(f"Camera Configuration:")
@@ -99,80 +182,81 @@ def main():
     if camera_config.get('focus_mode') == 'manual':
         logging.info(f"  Lens Position: {camera_config.get('lens_position', 'N/A')}")
     
-    # Initialize audio processor if enabled
-    audio_enabled = app_config.get('processor.enable_audio_processing')
-    audio_processor = None
-    regional_species = []  # Empty list signals "use all species from included_bird_families config"
-    
+    # Audio processor and regional species (the detection strategy needs them)
+    audio_processor, regional_species = species_future.result()
     if audio_enabled:
-        audio_processor = AudioProcessor(lat=app_config.get(
-            'secrets.latitude'), lon=app_config.get('secrets.longitude'), spectrogram_px_per_sec=app_config.get('processor.spectrogram_px_per_sec'))
-        regional_species = audio_processor.get_regional_species() + ["Squirrel"]
         logging.info("Audio Processing: ENABLED")
         logging.info(f"  Location: Configured")
         logging.info(f"  Spectrogram Resolution: {app_config.get('processor.spectrogram_px_per_sec')} px/sec")
     else:
         logging.info("Audio Processing: DISABLED")
-        
-    regional_species = api.set_active_species(regional_species)
 
-    # Initialize LLM verifier if API key is configured
-    gemini_api_key = app_config.get('ai.gemini_api_key')
-    llm_verifier = None
-    if gemini_api_key:
-        llm_verifier = LLMVerifier(
-            api_key=gemini_api_key,
-            model=app_config.get('ai.model'),
-            min_confidence=app_config.get('ai.llm_verification.min_confidence'),
-            max_calls_per_hour=app_config.get('ai.llm_verification.max_calls_per_hour'),
-            max_calls_per_day=app_config.get('ai.llm_verification.max_calls_per_day'),
-            latitude=app_config.get('secrets.latitude'),
-            longitude=app_config.get('secrets.longitude'),
-            log_dir=os.path.join('data', 'llm_verification_logs'),
-        )
+    # LLM verifier, if an API key is configured
+    llm_verifier = llm_future.result()
+    startup.shutdown()
+    if llm_verifier:
         logging.info("LLM Verification: ENABLED")
-        logging.info(f"  Model: {app_config.get('ai.model')}")
-        logging.info(f"  Min Confidence Threshold: {app_config.get('ai.llm_verification.min_confidence')}")
-        logging.info(f"  Rate Limits: {app_config.get('ai.llm_verification.max_calls_per_hour')}/hour, {app_config.get('ai.llm_verification.max_calls_per_day')}/day")
+        logging.info(f"  Model: {llm_verifier.model}")
+        logging.info(f"  Min Confidence Threshold: {llm_verifier.min_confidence}")
+        logging.info(f"  Rate Limits: {llm_verifier.max_calls_per_hour}/hour, {llm_verifier.max_calls_per_day}/day")
     else:
         logging.info("LLM Verification: DISABLED")
 
     # Configure Detection Strategy
     strategy_type = app_config.get('processor.detection_strategy', 'single_stage')
+    detection_batch_size = app_config.get('processor.detection_batch_size', 1)
+    detection_int8 = app_config.get('processor.detection_int8', False)
+    detection_int8_data = app_config.get('processor.detection_int8_data')
+    tracker = app_config.get('processor.tracker')
     if strategy_type == 'two_stage':
+        binary_model_path = app_config.get('processor.models.binary')
+        classifier_model_path = app_config.get('processor.models.classifier')
         detection_strategy = TwoStageStrategy(
-            binary_model_path=app_config.get('processor.models.binary'),
-            classifier_model_path=app_config.get('processor.models.classifier'),
-            regional_species=regional_species
+            binary_model_path=binary_model_path,
+            classifier_model_path=classifier_model_path,
+            regional_species=regional_species,
+            batch_size=detection_batch_size,
+            int8=detection_int8,
+            int8_data=detection_int8_data
         )
         logging.info("Detection Strategy: TWO_STAGE")
-        logging.info(f"  Binary Model: {app_config.get('processor.models.binary')}")
-        logging.info(f"  Classifier Model: {app_config.get('processor.models.classifier')}")
+        logging.info(f"  Binary Model: {binary_model_path}")
+        logging.info(f"  Classifier Model: {classifier_model_path}")
     else:
+        model_path = app_config.get('processor.models.single_stage')
         detection_strategy = SingleStageStrategy(
-            model_path=app_config.get('processor.models.single_stage'),
-            regional_species=regional_species
+            model_path=model_path,
+            regional_species=regional_species,
+            batch_size=detection_batch_size,
+            int8=detection_int8,
+            int8_data=detection_int8_data
         )
         logging.info("Detection Strategy: SINGLE_STAGE")
-        logging.info(f"  Model: {app_config.get('processor.models.single_stage')}")
+        logging.info(f"  Model: {model_path}")
     
-    logging.info(f"Tracker: {app_config.get('processor.tracker')}")
-    logging.info(f"Max Record Duration: {app_config.get('processor.max_record_seconds')}s")
-    logging.info(f"Max Inactive Duration: {app_config.get('processor.max_inactive_seconds')}s")
+    logging.info(f"Tracker: {tracker}")
+    logging.info(f"Detection Batch Size: {detection_batch_size}")
+    logging.info(f"Max Record Duration: {max_record_seconds}s")
+    logging.info(f"Max Inactive Duration: {max_inactive_seconds}s")
     logging.info(f"Regional Species Count: {len(regional_species)}")
     logging.info("=" * 80)
 
     frame_processor = FrameProcessor(
         detection_strategy=detection_strategy,
-        tracker=app_config.get('processor.tracker'), 
-        save_images=app_config.get('processor.save_images')
+        tracker=tracker, 
+        save_images=app_config.get('processor.save_images'),
+        batch_size=detection_batch_size,
+        batch_timeout=app_config.get('processor.detection_batch_timeout', 0.1),
+        pipelined=app_config.get('processor.pipelined_detection', False)
     )
     fps_tracker = FPSTracker()
+    # Capture the next frame on a background thread while the current one is processed
+    frame_source = FramePrefetcher(media_source) if app_config.get('processor.prefetch_frames', False) else media_source
 
     # Main motion detection loop
     logging.info("Entering main motion detection loop - waiting for motion...")
     motion_event_count = 0
-    while True:
+    while not shutdown.is_set():
         try:
             if not motion_detector.detect():
                 logging.debug("Motion detector returned False, continuing to wait...")
@@ -189,31 +273,38 @@ def main():
 
             logging.info(
                 f'Motion event #{motion_event_count}: Starting video/audio recording to "{video_output}"')
-            start_time = datetime.now(timezone.utc)
+            # Raw timestamps; datetimes are only built for events that get posted
+            start_ns = time.time_ns()
 
             # Video processing loop
             try:
                 frame_processor.reset()
                 decision_maker.reset()
                 fps_tracker.reset()
+                if frame_source is not media_source:
+                    frame_source.start()
                 while True:
-                    frame = media_source.capture()
+                    frame = frame_source.capture()
                     if frame is None:
                         break
                     with fps_tracker:
-                        has_detections = frame_processor.run(frame)
+                        has_detections = frame_processor.submit(frame)
 
                     # Decision making
                     decision_maker.update_has_detections(has_detections)
                     species = decision_maker.decide_species(frame_processor.tracks)
                     if species is not None:
                         api.notify_species(species)
-                    if decision_maker.decide_stop_recording():
+                    if decision_maker.decide_stop_recording() or shutdown.is_set():
                         break
+                # Detect on frames still buffered or in flight
+                frame_processor.flush()
                 fps_tracker.log_summary()
             finally:
+                if frame_source is not media_source:
+                    frame_source.stop()
                 media_source.stop_recording()
-                end_time = datetime.now(timezone.utc)
+                end_ns = time.time_ns()
 
             try:
                 video_detections = decision_maker.get_results(
@@ -225,19 +316,22 @@ def main():
                     
                     # LLM validation (if enabled)
                     if llm_verifier:
-                        video_detections = llm_verifier.validate_detections(video_detections, start_time)
+                        video_detections = llm_verifier.validate_detections(video_detections, _utc(start_ns))
                         
-                # Log summary without best_frame arrays
-                video_summary = [{k: v for k, v in d.items() if k != 'best_frame'} for d in video_detections]
-                logging.info(
-                    f'Processing stopped. Video Result: {video_summary}; Audio Result: {audio_detections}')
+                logging.info('Processing stopped. Video Result: %s; Audio Result: %s',
+                             _WithoutFrames(video_detections), audio_detections)
                 if len(video_detections) > 0:
-                    api.create_video(video_detections, audio_detections, start_time,
-                                     end_time, video_output, spectrogram_path)
+                    api.create_video(video_detections, audio_detections, _utc(start_ns),
+                                     _utc(end_ns), video_output, spectrogram_path)
                 else:
-                    # no detections, delete folder
+                    # no detections, delete folder. It normally holds only the video,
+                    # so skip rmtree's directory walk unless something else is there
                     try:
-                        shutil.rmtree(output_path)
+                        try:
+                            os.unlink(video_output)
+                            os.rmdir(output_path)
+                        except OSError:
+                            shutil.rmtree(output_path)
                     except Exception as e:
                         # Catch broad exception as shutil.rmtree can raise various errors
                         # (OSError, PermissionError, FileNotFoundError, etc.)
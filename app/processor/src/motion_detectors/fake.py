@@ -1,5 +1,5 @@
 import logging
-import time
+import threading
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
@@ -10,6 +10,8 @@ class FakeMotionDetector():
         self.wait = wait
         self.motion = motion
         self.detection_count = 0
+        # Set by stop() (e.g. from a SIGTERM handler) to end a simulated wait early
+        self.stop_event = threading.Event()
         logger.info(
             f"FakeMotionDetector initialized (wait={wait}s, motion={motion})"
         )
@@ -17,7 +19,8 @@ class FakeMotionDetector():
     def detect(self):
         logger.debug(f"FakeMotionDetector: Simulating wait for {self.wait}s...")
         wait_start = datetime.now()
-        time.sleep(self.wait)
+        if self.stop_event.wait(self.wait):
+            raise KeyboardInterrupt()
         self.detection_count += 1
         if self.motion:
             logger.info(
@@ -30,3 +33,7 @@ class FakeMotionDetector():
                 f"(check #{self.detection_count})"
             )
         return self.motion
+
+    def stop(self):
+        """Interrupt a pending detect(), which raises KeyboardInterrupt like Ctrl-C would."""
+        self.stop_event.set()
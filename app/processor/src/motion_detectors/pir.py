@@ -1,20 +1,71 @@
+import glob
 import logging
-from datetime import datetime
-from gpiozero import MotionSensor
+from datetime import datetime, timedelta
 
 logger = logging.getLogger(__name__)
 
+# libgpiod v2 bindings block in the kernel until an edge fires; gpiozero's
+# MotionSensor polls the pin from a background thread instead
+try:
+    import gpiod
+    from gpiod.line import Bias, Direction, Edge, Value
+    GPIOD_AVAILABLE = True
+except ImportError:
+    GPIOD_AVAILABLE = False
+
+
+def _header_gpio_chip():
+    """Path of the chip driving the 40-pin header (gpiochip0, or gpiochip4 on older Pi 5 kernels)."""
+    for path in sorted(glob.glob('/dev/gpiochip*')):
+        try:
+            with gpiod.Chip(path) as chip:
+                if chip.get_info().label.startswith('pinctrl-'):
+                    return path
+        except OSError:
+            continue
+    return '/dev/gpiochip0'
+
 
 class PIRMotionDetector():
     def __init__(self, pin=4):
-        self.pir = MotionSensor(pin)
+        self.pin = pin
         self.detection_count = 0
+        self.request = None
+        self.pir = None
+        if GPIOD_AVAILABLE:
+            try:
+                chip_path = _header_gpio_chip()
+                self.request = gpiod.request_lines(
+                    chip_path,
+                    consumer='birdlense-pir',
+                    config={pin: gpiod.LineSettings(
+                        direction=Direction.INPUT, edge_detection=Edge.RISING, bias=Bias.PULL_DOWN)},
+                )
+                logger.info(f"PIRMotionDetector initialized on GPIO pin {pin} ({chip_path}, edge events)")
+                return
+            except (OSError, ValueError) as e:
+                logger.warning(f"libgpiod edge events unavailable, polling with gpiozero: {e}")
+        from gpiozero import MotionSensor
+        self.pir = MotionSensor(pin)
         logger.info(f"PIRMotionDetector initialized on GPIO pin {pin}")
 
+    def _wait_for_edge(self):
+        # Edges that fired while we were recording are stale
+        while self.request.wait_edge_events(timedelta(0)):
+            self.request.read_edge_events()
+        # Like wait_for_motion(), return at once if the sensor is still active
+        if self.request.get_value(self.pin) == Value.ACTIVE:
+            return
+        self.request.wait_edge_events(None)
+        self.request.read_edge_events()
+
     def detect(self):
         logger.debug("Waiting for motion on PIR sensor...")
         wait_start = datetime.now()
-        self.pir.wait_for_motion()
+        if self.request is not None:
+            self._wait_for_edge()
+        else:
+            self.pir.wait_for_motion()
         wait_duration = (datetime.now() - wait_start).total_seconds()
         self.detection_count += 1
         logger.info(
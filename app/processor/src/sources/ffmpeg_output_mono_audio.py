@@ -1,11 +1,21 @@
-import gc
+import fcntl
+import os
+import shlex
 import signal
 import subprocess
 import prctl
 import logging
-import time
 from picamera2.outputs import Output
 
+# Pipe capacity to request for FFmpeg's stdin (Linux default is 64 KiB, unprivileged
+# maximum /proc/sys/fs/pipe-max-size is 1 MiB). Holds a few seconds of H264 so the
+# encoder keeps writing while FFmpeg is still initialising instead of blocking.
+PIPE_BUFFER_SIZE = 1 << 20
+F_SETPIPE_SZ = getattr(fcntl, 'F_SETPIPE_SZ', 1031)
+
+# Most of FFmpeg's stderr that is logged when a recording stops
+STDERR_LOG_LIMIT = 4096
+
 
 class FfmpegOutputMonoAudio(Output):
     """
@@ -18,6 +28,7 @@ class FfmpegOutputMonoAudio(Output):
                  audio_samplerate=48000, audio_codec="aac", audio_bitrate=128000, pts=None):
         super().__init__(pts=pts)
         self.ffmpeg = None
+        self._fd = None
         self.output_filename = output_filename
         self.audio = audio
         self.audio_device = audio_device
@@ -31,60 +42,78 @@ class FfmpegOutputMonoAudio(Output):
         self.logger = logging.getLogger(__name__)
         self.audio_enabled = audio  # Track if audio was initially requested
 
-    def start(self):
+        # Both command variants are built once; start() and its no-audio retry pick one
         general_options = ['-loglevel', 'warning', '-y']
         video_input = ['-use_wallclock_as_timestamps', '1',
                        '-thread_queue_size', '64',
                        '-i', '-']
         video_codec = ['-c:v', 'copy']
-        audio_input = []
-        audio_codec = []
+        audio_input = [
+            '-itsoffset', str(audio_sync),
+            '-f', 'alsa',
+            '-sample_rate', str(audio_samplerate),
+            '-channels', '1',  # Explicitly set mono
+            '-thread_queue_size', '1024',
+            '-i', audio_device
+        ]
+        audio_codec = [
+            '-b:a', str(audio_bitrate),
+            '-c:a', audio_codec,
+            '-ac', '1'  # Force mono output
+        ]
+        # shlex keeps quoted paths with spaces intact
+        output_args = shlex.split(output_filename)
+        self._cmd_with_audio = tuple(['ffmpeg'] + general_options + audio_input + video_input +
+                                     audio_codec + video_codec + output_args)
+        self._cmd_no_audio = tuple(['ffmpeg'] + general_options + video_input + video_codec + output_args)
 
-        if self.audio:
-            audio_input = [
-                '-itsoffset', str(self.audio_sync),
-                '-f', 'alsa',
-                '-sample_rate', str(self.audio_samplerate),
-                '-channels', '1',  # Explicitly set mono
-                '-thread_queue_size', '1024',
-                '-i', self.audio_device
-            ]
-            audio_codec = [
-                '-b:a', str(self.audio_bitrate),
-                '-c:a', self.audio_codec,
-                '-ac', '1'  # Force mono output
-            ]
+    @staticmethod
+    def _popen(command):
+        # Only the pipes are inherited; pdeathsig kills FFmpeg if the processor dies
+        return subprocess.Popen(command, stdin=subprocess.PIPE,
+                                stderr=subprocess.PIPE,
+                                close_fds=True,
+                                preexec_fn=lambda: prctl.set_pdeathsig(signal.SIGKILL))
+
+    def _grow_pipe(self, fd):
+        try:
+            fcntl.fcntl(fd, F_SETPIPE_SZ, PIPE_BUFFER_SIZE)
+        except Exception as e:
+            # Best effort; the default pipe size still works, just with less slack
+            self.logger.debug(f'Could not enlarge FFmpeg pipe buffer: {e}')
 
-        command = ['ffmpeg'] + general_options + audio_input + video_input + \
-            audio_codec + video_codec + self.output_filename.split()
+    def start(self):
+        command = self._cmd_with_audio if self.audio else self._cmd_no_audio
         
         self.logger.info(f'Starting FFmpeg for output: {self.output_filename}')
         self.logger.debug(f'FFmpeg command: {" ".join(command)}')
 
         try:
-            self.ffmpeg = subprocess.Popen(command, stdin=subprocess.PIPE,
-                                           stderr=subprocess.PIPE,
-                                           preexec_fn=lambda: prctl.set_pdeathsig(signal.SIGKILL))
+            self.ffmpeg = self._popen(command)
             
             # If audio was requested, verify FFmpeg started successfully
             if self.audio:
-                # Give FFmpeg a moment to fail if audio device is unavailable
-                time.sleep(0.3)
+                # Give FFmpeg a moment to fail if audio device is unavailable;
+                # wait() returns as soon as it exits instead of sleeping the full window
+                try:
+                    self.ffmpeg.wait(timeout=0.3)
+                except subprocess.TimeoutExpired:
+                    pass
                 
                 # Check if process has already exited
                 poll_result = self.ffmpeg.poll()
                 if poll_result is not None:
                     # Process exited, likely due to audio device error
                     stderr_output = self.ffmpeg.stderr.read().decode('utf-8', errors='ignore')
+                    self.ffmpeg.stdin.close()
+                    self.ffmpeg.stderr.close()
                     self.logger.warning(f"FFmpeg failed with audio device '{self.audio_device}': {stderr_output}")
                     self.logger.warning("Retrying video recording without audio...")
                     
                     # Retry without audio
                     self.audio = False
-                    command = ['ffmpeg'] + general_options + video_input + video_codec + self.output_filename.split()
-                    self.ffmpeg = subprocess.Popen(command, stdin=subprocess.PIPE,
-                                                   stderr=subprocess.PIPE,
-                                                   preexec_fn=lambda: prctl.set_pdeathsig(signal.SIGKILL))
+                    command = self._cmd_no_audio
+                    self.ffmpeg = self._popen(command)
                     self.logger.info("Successfully started video recording without audio")
         except Exception as e:
             # If audio was requested and Popen itself failed, try without audio
@@ -93,16 +122,17 @@ class FfmpegOutputMonoAudio(Output):
                 self.logger.warning("Retrying video recording without audio...")
                 try:
                     self.audio = False
-                    command = ['ffmpeg'] + general_options + video_input + video_codec + self.output_filename.split()
-                    self.ffmpeg = subprocess.Popen(command, stdin=subprocess.PIPE,
-                                                   stderr=subprocess.PIPE,
-                                                   preexec_fn=lambda: prctl.set_pdeathsig(signal.SIGKILL))
+                    command = self._cmd_no_audio
+                    self.ffmpeg = self._popen(command)
                     self.logger.info("Successfully started video recording without audio")
                 except Exception as retry_error:
                     self.logger.error(f"Failed to start FFmpeg even without audio: {retry_error}")
                     raise
             else:
                 raise
+        # Frames are written straight to the pipe fd, bypassing stdin's userspace buffer
+        self._fd = self.ffmpeg.stdin.fileno()
+        self._grow_pipe(self._fd)
                 
         super().start()
 
@@ -112,14 +142,15 @@ class FfmpegOutputMonoAudio(Output):
         if self.ffmpeg is not None:
             self.ffmpeg.stdin.close()
             try:
-                self.ffmpeg.wait(timeout=self.timeout)
-                # Log FFmpeg stderr for debugging
-                if self.ffmpeg.stderr:
-                    stderr_output = self.ffmpeg.stderr.read().decode('utf-8', errors='ignore')
+                returncode = self.ffmpeg.wait(timeout=self.timeout)
+                # FFmpeg's stderr is only worth reading if it failed or someone is debugging
+                if self.ffmpeg.stderr and returncode != 0:
+                    self.logger.warning(f'FFmpeg exited with code {returncode}: {self._read_stderr()}')
+                elif self.ffmpeg.stderr and self.logger.isEnabledFor(logging.DEBUG):
+                    stderr_output = self._read_stderr()
                     if stderr_output:
                         self.logger.debug(f'FFmpeg stderr: {stderr_output}')
                 # Verify file was created
-                import os
                 if os.path.exists(self.output_filename):
                     file_size = os.path.getsize(self.output_filename)
                     self.logger.info(f'Video file created: {self.output_filename}, size: {file_size} bytes')
@@ -131,7 +162,6 @@ class FfmpegOutputMonoAudio(Output):
                     self.ffmpeg.terminate()
                     self.ffmpeg.wait()  # Ensure process cleanup
                     # Still check if file was created
-                    import os
                     if os.path.exists(self.output_filename):
                         file_size = os.path.getsize(self.output_filename)
                         self.logger.info(f'Video file created (after timeout): {self.output_filename}, size: {file_size} bytes')
@@ -139,8 +169,16 @@ class FfmpegOutputMonoAudio(Output):
                         self.logger.error(f'Video file NOT created: {self.output_filename}')
                 except Exception as e:
                     self.logger.error(f'Error during FFmpeg cleanup: {e}')
+            # Close our pipe ends now rather than leaving them to the garbage collector
+            if self.ffmpeg.stderr:
+                self.ffmpeg.stderr.close()
             self.ffmpeg = None
-            gc.collect()
+            self._fd = None
+
+    def _read_stderr(self, limit=STDERR_LOG_LIMIT):
+        data = self.ffmpeg.stderr.read(limit + 1)
+        text = data[:limit].decode('utf-8', errors='ignore')
+        return text + '…' if len(data) > limit else text
 
     def outputframe(self, frame, keyframe=True, timestamp=None, packet=None, audio=False):
         if audio:
@@ -148,8 +186,11 @@ class FfmpegOutputMonoAudio(Output):
                 "FfmpegOutput does not support audio packets from Picamera2")
         if self.recording and self.ffmpeg:
             try:
-                self.ffmpeg.stdin.write(frame)
-                self.ffmpeg.stdin.flush()
+                # One syscall per packet; a pipe needs no flush. Loop in case a
+                # signal interrupts a write part way through
+                view = memoryview(frame).cast('B')
+                while view:
+                    view = view[os.writev(self._fd, (view,)):]
             except Exception as e:
                 self.ffmpeg = None
                 if self.error_callback:
@@ -0,0 +1,70 @@
+import logging
+import queue
+import threading
+
+
+class FramePrefetcher:
+    """
+    Captures frames from a media source on a background thread so the next
+    frame is already waiting while the current one is being processed.
+
+    Exposes the same capture() as the wrapped source. The queue is bounded:
+    when the consumer falls behind, the oldest frame is dropped so capture()
+    always returns a recent frame. None (end of source) is never dropped.
+    """
+
+    def __init__(self, source, maxsize=2):
+        self.logger = logging.getLogger(__name__)
+        self.source = source
+        self.maxsize = maxsize
+        self.frames = None
+        self.thread = None
+        self.stop_event = threading.Event()
+        self.dropped = 0
+
+    def start(self):
+        self.frames = queue.Queue(maxsize=self.maxsize)
+        self.stop_event.clear()
+        self.dropped = 0
+        self.thread = threading.Thread(target=self._capture_loop, name='frame-prefetch', daemon=True)
+        self.thread.start()
+
+    def capture(self):
+        return self.frames.get()
+
+    def stop(self):
+        """
+        Stop capturing. Waits for the in-flight capture to return, so the
+        source is never captured from and stopped at the same time.
+        """
+        if self.thread is None:
+            return
+        self.stop_event.set()
+        self.thread.join()
+        self.thread = None
+        if self.dropped:
+            self.logger.debug(f'Frame prefetch dropped {self.dropped} stale frames')
+
+    def _capture_loop(self):
+        while not self.stop_event.is_set():
+            try:
+                frame = self.source.capture()
+            except Exception as e:
+                self.logger.error(f'Frame capture failed: {e}', exc_info=True)
+                frame = None
+            self._put_latest(frame)
+            if frame is None:
+                return
+
+    def _put_latest(self, frame):
+        # Only this thread puts, so after dropping the oldest frame there is room
+        try:
+            self.frames.put_nowait(frame)
+        except queue.Full:
+            # Keep realtime: replace the oldest frame with the new one
+            try:
+                self.frames.get_nowait()
+                self.dropped += 1
+            except queue.Empty:
+                pass
+            self.frames.put_nowait(frame)
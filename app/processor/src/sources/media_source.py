@@ -2,14 +2,15 @@ import logging
 import threading
 import io
 import multiprocessing
-import socketserver
-from http import server
-from threading import Condition
+from multiprocessing import shared_memory
+import selectors
+import socket
 from picamera2 import Picamera2
 from picamera2.encoders import H264Encoder, JpegEncoder, Quality
 from picamera2.outputs import FileOutput
 from .ffmpeg_output_mono_audio import FfmpegOutputMonoAudio
 import cv2
+import numpy as np
 try:
     from libcamera import controls
 except ImportError:
@@ -21,60 +22,192 @@ except ImportError:
     IMX708 = None
 
 
+# frame_queue token for "capture": the lores frame was copied into the shared memory block
+FRAME_IN_SHM = 'shm'
+
+
+def _i420_shape(size: tuple) -> tuple:
+    """Array shape of a YUV420 (I420) frame of the given (width, height)."""
+    width, height = size
+    return (height * 3 // 2, width)
+
+
 class StreamingOutput(io.BufferedIOBase):
-    """Manages streaming frame buffer with thread-safe updates."""
+    """Holds the latest encoded frame and tells the streaming server about it."""
 
     def __init__(self):
         self.frame = None
-        self.condition = Condition()
+        self.on_frame = None  # set by StreamingServer
 
     def write(self, buf: bytes) -> int:
-        with self.condition:
-            self.frame = buf
-            self.condition.notify_all()
+        # Replacing the reference is atomic; the server reads it after waking
+        self.frame = buf
+        if self.on_frame is not None:
+            self.on_frame()
         return len(buf)
 
 
-class StreamingHandler(server.BaseHTTPRequestHandler):
-    """Handles HTTP requests for video streaming."""
+# Sent once per client, then one multipart part per frame
+RESPONSE_HEADER = (b'HTTP/1.0 200 OK\r\n'
+                   b'Cache-Control: no-cache, private\r\n'
+                   b'Content-Type: multipart/x-mixed-replace; boundary=FRAME\r\n\r\n')
+# Multipart part header, formatted with the JPEG's length
+PART_HEADER = b'--FRAME\r\nContent-Type: image/jpeg\r\nContent-Length: %d\r\n\r\n'
+MAX_REQUEST_SIZE = 64 * 1024
 
-    def do_GET(self):
-        self.server.control_queue.put(("client_connect", None))
-        try:
-            self.send_response(200)
-            self.send_header('Cache-Control', 'no-cache, private')
-            self.send_header(
-                'Content-Type', 'multipart/x-mixed-replace; boundary=FRAME')
-            self.end_headers()
-
-            output = self.server.streaming_output
-            while True:
-                with output.condition:
-                    output.condition.wait()
-                    frame = output.frame
-                self.wfile.write(b'--FRAME\r\n')
-                self.wfile.write(b'Content-Type: image/jpeg\r\n')
-                self.wfile.write(f'Content-Length: {len(frame)}\r\n\r\n'.encode())
-                self.wfile.write(frame)
-                self.wfile.write(b'\r\n')
-        except Exception as e:
-            logging.warning(f"Client disconnected: {e}")
-        finally:
-            self.server.control_queue.put(("client_disconnect", None))
 
+def _consume(buffers: list, sent: int):
+    """Drop `sent` bytes from the front of a list of memoryviews."""
+    while buffers and sent >= len(buffers[0]):
+        sent -= len(buffers.pop(0))
+    if buffers:
+        buffers[0] = buffers[0][sent:]
 
-class StreamingServer(socketserver.ThreadingMixIn, server.HTTPServer):
-    """Custom HTTP server for video streaming."""
-    allow_reuse_address = True
-    daemon_threads = True
+
+class StreamingClient:
+    """Per-connection state of the streaming server."""
+
+    def __init__(self):
+        self.request = b''
+        self.streaming = False
+        self.pending = []  # memoryviews of the response/part still being sent
+        self.events = selectors.EVENT_READ
+
+
+class StreamingServer:
+    """
+    MJPEG streaming server running on a single selector thread.
+
+    Each new frame is fanned out to all clients with non-blocking scatter-gather
+    sends. A client still sending an earlier frame skips the new one, so a slow
+    viewer never holds up the encoder or the other viewers, and nothing queues
+    up for it beyond one frame.
+    """
+
+    def __init__(self, streaming_output: StreamingOutput, control_queue: multiprocessing.Queue, port: int = 8082):
+        self.output = streaming_output
+        self.control_queue = control_queue
+        self.clients = {}
+        self.selector = selectors.DefaultSelector()
+
+        self.listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if hasattr(socket, 'SO_REUSEPORT'):
+            self.listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        self.listener.bind(('0.0.0.0', port))
+        self.listener.listen()
+        self.listener.setblocking(False)
+        self.selector.register(self.listener, selectors.EVENT_READ, self._accept)
+
+        # The encoder thread wakes the selector through a socket pair
+        self._wake_recv, self._wake_send = socket.socketpair()
+        self._wake_recv.setblocking(False)
+        self._wake_send.setblocking(False)
+        self.selector.register(self._wake_recv, selectors.EVENT_READ, self._send_frame)
+        streaming_output.on_frame = self.wake
+
+    def wake(self):
+        try:
+            self._wake_send.send(b'\0')
+        except OSError:
+            pass  # buffer full: a wakeup is already pending
+
+    def serve_forever(self):
+        while True:
+            for key, mask in self.selector.select():
+                try:
+                    key.data(key.fileobj, mask)
+                except Exception as e:
+                    logging.error(f"Streaming server error: {e}", exc_info=True)
+
+    def _accept(self, listener, mask):
+        try:
+            conn, _ = listener.accept()
+        except BlockingIOError:
+            return
+        conn.setblocking(False)
+        self.clients[conn] = StreamingClient()
+        self.selector.register(conn, selectors.EVENT_READ, self._on_client)
+
+    def _on_client(self, conn, mask):
+        client = self.clients[conn]
+        if mask & selectors.EVENT_READ:
+            try:
+                data = conn.recv(4096)
+            except BlockingIOError:
+                data = None
+            except OSError:
+                data = b''
+            if data == b'':
+                self._drop(conn)
+                return
+            if data and not client.streaming:
+                self._read_request(conn, client, data)
+                if conn not in self.clients:
+                    return
+        if mask & selectors.EVENT_WRITE:
+            self._flush(conn, client)
+
+    def _read_request(self, conn, client, data):
+        client.request += data
+        if b'\r\n\r\n' not in client.request:
+            if len(client.request) > MAX_REQUEST_SIZE:
+                self._drop(conn)
+            return
+        if not client.request.startswith(b'GET '):
+            self._drop(conn)
+            return
+        client.request = b''
+        client.streaming = True
+        self.control_queue.put(("client_connect", None))
+        client.pending = [memoryview(RESPONSE_HEADER)]
+        self._flush(conn, client)
+
+    def _send_frame(self, wake_recv, mask):
+        try:
+            while wake_recv.recv(4096):
+                pass
+        except BlockingIOError:
+            pass
+        frame = self.output.frame
+        if frame is None:
+            return
+        part = (memoryview(PART_HEADER % len(frame)), memoryview(frame), memoryview(b'\r\n'))
+        for conn, client in list(self.clients.items()):
+            if client.streaming and not client.pending:
+                client.pending = list(part)
+                self._flush(conn, client)
+
+    def _flush(self, conn, client):
+        """Send as much pending data as the socket takes; watch for writability while some is left."""
+        try:
+            while client.pending:
+                _consume(client.pending, conn.sendmsg(client.pending))
+        except BlockingIOError:
+            pass
+        except OSError as e:
+            logging.warning(f"Client disconnected: {e}")
+            self._drop(conn)
+            return
+        events = selectors.EVENT_READ | (selectors.EVENT_WRITE if client.pending else 0)
+        if events != client.events:
+            self.selector.modify(conn, events, self._on_client)
+            client.events = events
+
+    def _drop(self, conn):
+        client = self.clients.pop(conn, None)
+        if client is None:
+            return
+        self.selector.unregister(conn)
+        conn.close()
+        if client.streaming:
+            self.control_queue.put(("client_disconnect", None))
 
 
 def start_streaming_server(streaming_output: StreamingOutput, control_queue: multiprocessing.Queue, port: int = 8082):
     """Starts the streaming server."""
-    server = StreamingServer(('0.0.0.0', port), StreamingHandler)
-    server.streaming_output = streaming_output
-    server.control_queue = control_queue
-    threading.Thread(target=server.serve_forever, daemon=True).start()
+    server = StreamingServer(streaming_output, control_queue, port)
+    threading.Thread(target=server.serve_forever, name='mjpeg-stream', daemon=True).start()
     logging.info('Started streaming server')
     return server
 
@@ -105,9 +238,12 @@ def _enable_hdr_if_available():
         return False
 
 
-def recording_worker(control_queue: multiprocessing.Queue, frame_queue: multiprocessing.Queue, main_size: tuple, lores_size: tuple, camera_config: dict = None):
+def recording_worker(control_queue: multiprocessing.Queue, frame_queue: multiprocessing.Queue, main_size: tuple, lores_size: tuple, camera_config: dict = None, frame_shm: shared_memory.SharedMemory = None):
     """Handles video processing and streaming."""
     logging.info("Recording worker started")
+    shm_frame = None
+    if frame_shm is not None:
+        shm_frame = np.ndarray(_i420_shape(lores_size), dtype=np.uint8, buffer=frame_shm.buf)
 
     # Enable HDR if configured (must be done before Picamera2 init)
     if camera_config and camera_config.get('hdr_mode', True):
@@ -167,8 +303,9 @@ def recording_worker(control_queue: multiprocessing.Queue, frame_queue: multipro
             if not recording:
                 picam2.start()
                 recording = True
-            # push first frame to signal that recording has started
-            frame_queue.put(picam2.capture_array("lores"))
+            # Wait for the next frame's metadata (no image copy), then signal that recording has started
+            picam2.capture_metadata()
+            frame_queue.put(True)
         elif command == "stop":
             processor_active = False
             logging.info('Recording worker received STOP command')
@@ -180,7 +317,13 @@ def recording_worker(control_queue: multiprocessing.Queue, frame_queue: multipro
             # put empty frame to signal that recording has stopped
             frame_queue.put(None)
         elif command == "capture":
-            frame_queue.put(picam2.capture_array("lores"))
+            frame = picam2.capture_array("lores")
+            if shm_frame is not None and frame.shape == shm_frame.shape:
+                # Only a short token goes through the pipe; the parent reads the shared block
+                np.copyto(shm_frame, frame)
+                frame_queue.put(FRAME_IN_SHM)
+            else:
+                frame_queue.put(frame)
         elif command == "client_connect":
             active_clients += 1
             if active_clients == 1:
@@ -213,9 +356,15 @@ class MediaSource:
             
         self.frame_queue = multiprocessing.Queue(maxsize=1)
         self.control_queue = multiprocessing.Queue()
+        # Captured lores frames are handed over in shared memory instead of being
+        # pickled through frame_queue. capture() is request/response, so the worker
+        # only overwrites the block after the previous frame has been converted.
+        shape = _i420_shape(lores_size)
+        self.frame_shm = shared_memory.SharedMemory(create=True, size=shape[0] * shape[1])
+        self._shm_frame = np.ndarray(shape, dtype=np.uint8, buffer=self.frame_shm.buf)
         self.process = multiprocessing.Process(
             target=recording_worker,
-            args=(self.control_queue, self.frame_queue, main_size, lores_size, camera_config),
+            args=(self.control_queue, self.frame_queue, main_size, lores_size, camera_config, self.frame_shm),
         )
         self.process.start()
 
@@ -223,7 +372,7 @@ class MediaSource:
         if not output:
             raise ValueError("output path cannot be empty")
         self.control_queue.put(("start", output))
-        # capture first frame before proceeding to make sure camera is running
+        # wait for the started signal before proceeding to make sure camera is running
         self.frame_queue.get()
 
     def stop_recording(self):
@@ -236,8 +385,13 @@ class MediaSource:
         image = self.frame_queue.get()
         if image is None:
             return None
+        if isinstance(image, str):  # FRAME_IN_SHM
+            image = self._shm_frame
         # Convert YUV420 (I420 format) from lores stream to BGR for OpenCV
         # Picamera2 uses I420 (Y-U-V planar), not YV12 (Y-V-U), so use COLOR_YUV2BGR_I420
+        # The full conversion is needed: every consumer (detector, classifier crops,
+        # best-frame snapshots) works on colour. The light check, the one luma-only
+        # user, subsamples the BGR frame and only runs every few seconds.
         return cv2.cvtColor(image, cv2.COLOR_YUV2BGR_I420)
 
     def close(self):
@@ -260,3 +414,8 @@ class MediaSource:
                     self.process.join()
             except Exception:
                 pass
+        finally:
+            # Drop the array view before closing, or close() fails with exported buffers
+            self._shm_frame = None
+            self.frame_shm.close()
+            self.frame_shm.unlink()
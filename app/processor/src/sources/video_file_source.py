@@ -1,23 +1,58 @@
+import functools
 import logging
 import os
 import subprocess
+import threading
 import cv2
+import numpy as np
 import time
 
 
+@functools.lru_cache(maxsize=None)
+def _h264_encoder_args(width, height):
+    """
+    FFmpeg output options for H.264, probed once per size.
+
+    Uses the V4L2 M2M hardware encoder when a test encode succeeds (Raspberry
+    Pi 4; the Pi 5 has no H.264 encoder block), otherwise libx264.
+    """
+    hardware = ['-c:v', 'h264_v4l2m2m', '-b:v', '4M']
+    probe = ['ffmpeg', '-hide_banner', '-loglevel', 'error',
+             '-f', 'lavfi', '-i', f'color=size={width}x{height}:duration=0.2',
+             '-pix_fmt', 'yuv420p'] + hardware + ['-f', 'null', '-']
+    try:
+        result = subprocess.run(probe, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                                stderr=subprocess.DEVNULL, timeout=10)
+        if result.returncode == 0:
+            logging.getLogger(__name__).info('Using h264_v4l2m2m hardware encoder')
+            return hardware
+    except (OSError, subprocess.TimeoutExpired):
+        pass
+    return ['-c:v', 'libx264', '-preset', 'fast']
+
+
 class VideoFileSource:
     """
     Video file source that accurately simulates real camera behavior:
     - Tracks elapsed time between capture() calls
     - Skips frames that would have passed during processing
     - Writes ALL frames to disk (skipped ones too)
+
+    Recording runs on a writer thread with its own decoder, which follows the
+    position capture() has reached; capture() itself only demuxes the frames
+    it skips and decodes the one it returns.
     """
 
     def __init__(self, video_path, main_size=(1280, 720), lores_size=(640, 640)):
         self.logger = logging.getLogger(__name__)
+        self.video_path = video_path
         self.cap = cv2.VideoCapture(video_path)
+        self.position = 0  # source frames consumed by capture()
         self.main_size = main_size
         self.lores_size = lores_size
+        # (height, width) as in frame.shape, to skip resizing frames already at size
+        self._main_hw = (main_size[1], main_size[0])
+        self._lores_hw = (lores_size[1], lores_size[0])
         self.ffmpeg_process = None
         self.output_path = None
         
@@ -25,6 +60,11 @@ class VideoFileSource:
         self.frame_interval = 1.0 / self.source_fps
         self.last_capture_time = None
         self.frame_count = 0
+
+        self._writer = None
+        self._write_cond = threading.Condition()
+        self._write_until = 0  # source frame index (exclusive) the writer may write up to
+        self._write_stop = False
         
         self.logger.info(f'VideoFileSource: {self.source_fps} FPS')
 
@@ -49,9 +89,9 @@ class VideoFileSource:
             '-pix_fmt', 'bgr24',
             '-s', f'{width}x{height}',
             '-r', str(self.source_fps),
+            '-thread_queue_size', '64',
             '-i', '-',  # Read from stdin
-            '-c:v', 'libx264',
-            '-preset', 'fast',
+            *_h264_encoder_args(width, height),
             '-pix_fmt', 'yuv420p',
             output
         ]
@@ -70,8 +110,61 @@ class VideoFileSource:
         self.frame_count = 0
         self.last_capture_time = None  # Will be set on first capture
 
+        if self.ffmpeg_process is not None:
+            self._write_until = self.position
+            self._write_stop = False
+            self._writer = threading.Thread(target=self._write_frames, args=(self.ffmpeg_process, self.position),
+                                            name='video-file-writer', daemon=True)
+            self._writer.start()
+
+    def _write_frames(self, process, start):
+        """Decode the source from frame `start` and pipe every frame up to _write_until to FFmpeg."""
+        cap = cv2.VideoCapture(self.video_path)
+        if start:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+        position = start
+        # Each frame is fully written before the next resize, so one buffer is reused
+        main_buf = np.empty((*self._main_hw, 3), dtype=np.uint8)
+        try:
+            while True:
+                with self._write_cond:
+                    while position >= self._write_until and not self._write_stop:
+                        self._write_cond.wait()
+                    if position >= self._write_until:
+                        return
+                ret, frame = cap.read()
+                if not ret:
+                    return
+                position += 1
+                frame_main = frame if frame.shape[:2] == self._main_hw else cv2.resize(frame, self.main_size, dst=main_buf)
+                # cv2 frames are C-contiguous, so the pipe can read the array's buffer directly
+                process.stdin.write(memoryview(frame_main).cast('B'))
+
+                # Log every 100 frames to confirm writing
+                if (position - start) % 100 == 0:
+                    self.logger.debug(f'Written {position - start} frames')
+        except BrokenPipeError:
+            self.logger.error('FFmpeg pipe broken, stopping recording')
+        except Exception as e:
+            self.logger.error(f'Error writing frame to FFmpeg: {e}')
+        finally:
+            cap.release()
+
+    def _release_to_writer(self):
+        if self._writer is not None:
+            with self._write_cond:
+                self._write_until = self.position
+                self._write_cond.notify()
+
     def stop_recording(self):
         self.logger.info(f'Stop video recording, frames written: {self.frame_count}')
+        if self._writer is not None:
+            # Let the writer catch up with every frame captured so far
+            with self._write_cond:
+                self._write_stop = True
+                self._write_cond.notify()
+            self._writer.join()
+            self._writer = None
         if self.ffmpeg_process is not None:
             try:
                 self.ffmpeg_process.stdin.close()
@@ -99,7 +192,9 @@ class VideoFileSource:
     def capture(self):
         """
         Get next frame for processing.
-        Advances video by elapsed real time, writing skipped frames to disk.
+        Advances video by elapsed real time, writing skipped frames to disk
+        (via the writer thread, if recording). Skipped frames are never
+        decoded here, whether recording or not.
         Returns None when video ends.
         """
         if not self.cap.isOpened():
@@ -115,34 +210,27 @@ class VideoFileSource:
             frames_to_advance = max(1, int(elapsed / self.frame_interval))
         self.last_capture_time = now
         
-        # Read and write frames, return only the last one
+        # Skipped frames are only demuxed (grab); the recording writer decodes
+        # them on its own. Only the returned frame is decoded here.
         result_frame = None
-        for _ in range(frames_to_advance):
-            ret, frame = self.cap.read()
+        for i in range(frames_to_advance):
+            ret = self.cap.grab()
+            if ret:
+                self.position += 1
+                self.frame_count += 1
+                if i == frames_to_advance - 1:
+                    ret, result_frame = self.cap.retrieve()
             if not ret:
-                self.logger.info(f'Video ended after {self.frame_count} frames')
-                return None
-            
-            self.frame_count += 1
-            
-            # Write ALL frames to FFmpeg
-            if self.ffmpeg_process is not None and self.ffmpeg_process.stdin:
-                try:
-                    frame_main = cv2.resize(frame, self.main_size)
-                    self.ffmpeg_process.stdin.write(frame_main.tobytes())
-                except BrokenPipeError:
-                    self.logger.error('FFmpeg pipe broken, stopping recording')
-                    self.ffmpeg_process = None
-                except Exception as e:
-                    self.logger.error(f'Error writing frame to FFmpeg: {e}')
-            
-            # Log every 100 frames to confirm writing
-            if self.frame_count % 100 == 0:
-                self.logger.debug(f'Written {self.frame_count} frames')
-            
-            result_frame = frame
+                break
+        self._release_to_writer()
+        if result_frame is None:
+            self.logger.info(f'Video ended after {self.frame_count} frames')
+            return None
         
-        return cv2.resize(result_frame, self.lores_size) if result_frame is not None else None
+        # A new array every call: callers queue frames and keep crops of them
+        if result_frame.shape[:2] == self._lores_hw:
+            return result_frame
+        return cv2.resize(result_frame, self.lores_size)
 
     def close(self):
         self.stop_recording()
@@ -81,5 +81,36 @@ class TestAppConfigEnvOverrides(unittest.TestCase):
         self.assertTrue(result['processor']['enable_audio_processing'])
 
 
+class TestAppConfigMergeDicts(unittest.TestCase):
+    def test_nested_merge(self):
+        """Test that nested overrides merge into base without dropping siblings."""
+        base = {'a': {'b': {'c': 1, 'd': 2}, 'e': 3}, 'f': 4}
+        overrides = {'a': {'b': {'c': 10}, 'g': 5}, 'f': {'h': 6}}
+        result = AppConfig.merge_dicts(base, overrides)
+        self.assertIs(result, base)
+        self.assertEqual(result, {'a': {'b': {'c': 10, 'd': 2}, 'e': 3, 'g': 5}, 'f': {'h': 6}})
+
+
+class TestAppConfigGet(unittest.TestCase):
+    def setUp(self):
+        self.config = AppConfig()
+        self.config.config = {'processor': {'tracker': 'bytetrack.yaml', 'save_images': False}}
+
+    def test_get_nested_and_default(self):
+        """Test nested lookups, falsy values and defaults for missing keys."""
+        self.assertEqual(self.config.get('processor.tracker'), 'bytetrack.yaml')
+        self.assertFalse(self.config.get('processor.save_images', True))
+        self.assertEqual(self.config.get('processor.missing', 'x'), 'x')
+        self.assertEqual(self.config.get('missing.key', 'y'), 'y')
+
+    def test_set_invalidates_cached_lookup(self):
+        """Test that set() and config reassignment are visible to get()."""
+        self.assertEqual(self.config.get('processor.tracker'), 'bytetrack.yaml')
+        self.config.set('processor.tracker', 'botsort.yaml')
+        self.assertEqual(self.config.get('processor.tracker'), 'botsort.yaml')
+        self.config.config = {'processor': {'tracker': 'other.yaml'}}
+        self.assertEqual(self.config.get('processor.tracker'), 'other.yaml')
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -92,5 +92,43 @@ class TestDecisionMaker(unittest.TestCase):
         # Voting: 0.6. Avg Conf: (2.7 + 1.5)/6 = 0.7. Result: 0.42
         self.assertAlmostEqual(results[0]['confidence'], 0.42)
 
+    def test_short_track_rejected(self):
+        """
+        Test case: Tracks shorter than min_track_duration are rejected regardless of confidence.
+        """
+        dm = DecisionMaker(min_track_duration=2)
+        tracks = {
+            1: {
+                'start_time': 0.0,
+                'end_time': 1.0,
+                'preds': [('Cardinal', 0.9)] * 10,
+                'best_frame': None
+            }
+        }
+        self.assertEqual(dm.get_results(tracks), [])
+
+    def test_decide_stop_recording_after_inactivity(self):
+        """
+        Test case: Recording stops once inactivity exceeds max_inactive_seconds, and only once.
+        """
+        dm = DecisionMaker(max_record_seconds=60, max_inactive_seconds=5)
+        self.assertFalse(dm.decide_stop_recording())
+        dm.update_has_detections(False)
+        dm.inactive_start_time -= 5
+        self.assertTrue(dm.decide_stop_recording())
+        self.assertFalse(dm.decide_stop_recording())
+
+    def test_decide_species_first_accepted_track(self):
+        """
+        Test case: The species comes from the first accepted track, and is decided only once.
+        """
+        tracks = {
+            1: {'start_time': 0.0, 'end_time': 1.0, 'preds': [('Cardinal', 0.05)] * 10, 'best_frame': None},
+            2: {'start_time': 0.0, 'end_time': 1.0, 'preds': [('Blue Jay', 0.9)] * 10, 'best_frame': None},
+            3: {'start_time': 0.0, 'end_time': 1.0, 'preds': [('House Finch', 0.9)] * 10, 'best_frame': None},
+        }
+        self.assertEqual(self.decision_maker.decide_species(tracks), 'Blue Jay')
+        self.assertIsNone(self.decision_maker.decide_species(tracks))
+
 if __name__ == '__main__':
     unittest.main()
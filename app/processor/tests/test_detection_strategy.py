@@ -12,7 +12,7 @@ src_path = os.path.abspath(os.path.join(current_dir, '../src'))
 sys.path.append(src_path)
 
 try:
-    from detection_strategy import TwoStageStrategy, SingleStageStrategy
+    from detection_strategy import TwoStageStrategy, SingleStageStrategy, match_class_ids
 except ImportError:
     pass
 
@@ -127,5 +127,13 @@ class TestDetectionStrategy(unittest.TestCase):
         self.logger.info(f"Blurred image variance: {variance}")
         self.assertTrue(is_blurry, "Blurred image should be detected as blurry")
 
+    def test_match_class_ids(self):
+        names = {0: 'Blue Jay', 1: 'Dark-eyed Junco (Slate-colored)', 2: 'Gray Jay',
+                 3: 'House Sparrow', 4: 'Song Sparrow', 5: 'Squirrel'}
+        species = ['Blue Jay', 'Dark-eyed Junco (Slate-colored)', 'Sparrow']
+        expected = [cid for cid, label in names.items() if any(s in label for s in species)]
+        self.assertEqual(match_class_ids(names, species), expected)
+        self.assertEqual(match_class_ids(names, species), [0, 1, 3, 4])
+
 if __name__ == '__main__':
     unittest.main()
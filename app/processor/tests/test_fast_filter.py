@@ -0,0 +1,51 @@
+import unittest
+import sys
+import os
+import numpy as np
+
+# Ensure project root is in path to import app modules
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_path = os.path.abspath(os.path.join(current_dir, '../src'))
+sys.path.append(src_path)
+
+import fast_filter
+
+
+class TestFilterBoxes(unittest.TestCase):
+
+    def setUp(self):
+        self.h, self.w = 480, 640
+        rng = np.random.default_rng(0)
+        corners = rng.uniform(-0.1, 1.1, (300, 2, 2)).astype(np.float32)
+        self.xyxyn = np.concatenate([corners.min(axis=1), corners.max(axis=1)], axis=1)
+        self.xyxy = self.xyxyn * np.array([self.w, self.h, self.w, self.h], dtype=np.float32)
+        self.confidences = rng.random(300).astype(np.float32)
+
+    def test_matches_scalar_checks(self):
+        mask, coords = fast_filter.filter_boxes(
+            self.xyxyn, self.xyxy, self.confidences, (self.h, self.w, 3), 0.1, 50, 0.3)
+
+        for i in range(len(self.xyxy)):
+            x1, y1, x2, y2 = map(int, self.xyxy[i])
+            x1, y1 = max(0, x1), max(0, y1)
+            x2, y2 = min(self.w, x2), min(self.h, y2)
+            cx = (self.xyxyn[i, 0] + self.xyxyn[i, 2]) / 2
+            cy = (self.xyxyn[i, 1] + self.xyxyn[i, 3]) / 2
+            expected = (0.1 <= cx <= 0.9 and 0.1 <= cy <= 0.9 and
+                        self.confidences[i] >= 0.3 and
+                        x2 - x1 >= 50 and y2 - y1 >= 50)
+            self.assertEqual(bool(mask[i]), expected)
+            if expected:
+                self.assertEqual(coords[i].tolist(), [x1, y1, x2, y2])
+
+    @unittest.skipUnless(fast_filter.NUMBA_AVAILABLE, "numba not installed")
+    def test_numba_matches_numpy(self):
+        args = (self.xyxyn, self.xyxy, self.confidences, float(self.w), float(self.h), 0.1, 50, 0.3)
+        mask_nb, coords_nb = fast_filter._filter_boxes_numba(*args)
+        mask_np, coords_np = fast_filter._filter_boxes_numpy(*args)
+        np.testing.assert_array_equal(mask_nb, mask_np)
+        np.testing.assert_array_equal(coords_nb, coords_np)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+import sys
+import os
+
+# Ensure project root is in path to import app modules
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_path = os.path.abspath(os.path.join(current_dir, '../src'))
+sys.path.append(src_path)
+
+from fps_tracker import FPSTracker
+
+
+class FakeClock:
+    """Advances by the next given step each time it is read at frame end."""
+
+    def __init__(self, steps):
+        self.steps = list(steps)
+        self.now = 0.0
+        self.started = False
+
+    def __call__(self):
+        if self.started:
+            self.now += self.steps.pop(0)
+        self.started = not self.started
+        return self.now
+
+
+class TestFPSTracker(unittest.TestCase):
+
+    def test_summary_after_ring_wraps(self):
+        tracker = FPSTracker(capacity=4)
+        tracker.timer = FakeClock([1.0, 1.0, 0.5, 0.5, 0.25, 0.25])
+        for _ in range(6):
+            with tracker:
+                pass
+
+        self.assertEqual(tracker.total_frames, 6)
+        self.assertAlmostEqual(tracker.total_time, 3.5)
+        # Only the last four frame times are kept
+        self.assertEqual(sorted(tracker.frame_times.tolist()), [0.25, 0.25, 0.5, 0.5])
+
+        with self.assertLogs('fps_tracker', level='INFO') as logs:
+            tracker.log_summary()
+        self.assertIn('6 frames in 3.5s', logs.output[0])
+        self.assertIn('Min: 2.0 | Max: 4.0', logs.output[0])
+        self.assertEqual(tracker.total_frames, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
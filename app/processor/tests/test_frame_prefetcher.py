@@ -0,0 +1,42 @@
+import unittest
+import sys
+import os
+
+# Ensure project root is in path to import app modules
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_path = os.path.abspath(os.path.join(current_dir, '../src'))
+sys.path.append(src_path)
+
+from sources.frame_prefetcher import FramePrefetcher
+
+
+class ListSource:
+    """Returns the given frames in order, then None."""
+
+    def __init__(self, frames):
+        self.frames = list(frames)
+
+    def capture(self):
+        return self.frames.pop(0) if self.frames else None
+
+
+class TestFramePrefetcher(unittest.TestCase):
+
+    def test_frames_in_order_then_end(self):
+        prefetcher = FramePrefetcher(ListSource(range(1, 4)), maxsize=10)
+        prefetcher.start()
+        self.assertEqual([prefetcher.capture() for _ in range(4)], [1, 2, 3, None])
+        prefetcher.stop()
+
+    def test_slow_consumer_gets_latest_frames(self):
+        prefetcher = FramePrefetcher(ListSource(range(1, 101)), maxsize=2)
+        prefetcher.start()
+        prefetcher.thread.join(timeout=5)
+        # Stale frames were dropped, the end marker was kept
+        self.assertEqual([prefetcher.capture(), prefetcher.capture()], [100, None])
+        self.assertEqual(prefetcher.dropped, 99)
+        prefetcher.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,155 @@
+import unittest
+import sys
+import os
+import numpy as np
+
+# Ensure project root is in path to import app modules
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_path = os.path.abspath(os.path.join(current_dir, '../src'))
+sys.path.append(src_path)
+
+from detection_strategy import DetectionStrategy, DetectionResult
+from frame_processor import FrameProcessor, FrameLog
+
+
+class CountingStrategy(DetectionStrategy):
+    """Reports one bird (track 1) on every frame whose first pixel is non-zero."""
+
+    def __init__(self):
+        super().__init__()
+        self.frames_seen = 0
+
+    def detect(self, frame, tracker_config, min_confidence):
+        self.frames_seen += 1
+        if frame[0, 0, 0] == 0:
+            return []
+        return [DetectionResult(track_id=1, class_name='Blue Jay', confidence=0.9, bbox=[0.4, 0.4, 0.6, 0.6])]
+
+    def reset(self):
+        pass
+
+
+def make_frame(bird):
+    # Textured so the light check passes
+    frame = np.tile(np.arange(0, 256, 4, dtype=np.uint8), (64, 1))
+    frame = np.dstack([frame] * 3)
+    frame[0, 0, 0] = 255 if bird else 0
+    return frame
+
+
+class TestFrameProcessor(unittest.TestCase):
+
+    def test_run_updates_tracks(self):
+        processor = FrameProcessor(CountingStrategy())
+        self.assertFalse(processor.run(make_frame(bird=False)))
+        self.assertTrue(processor.run(make_frame(bird=True)))
+        self.assertEqual(processor.tracks[1]['preds'], [('Blue Jay', 0.9)])
+
+    def test_best_frame_prefers_sharpness(self):
+        processor = FrameProcessor(CountingStrategy())
+        bbox = [0.4, 0.4, 0.6, 0.6]
+        small_sharp = np.zeros((100, 100, 3), dtype=np.uint8)
+        large_blurry = np.zeros((150, 150, 3), dtype=np.uint8)
+        processor.update_track(1, 'Blue Jay', 0.9, bbox, 0.0, small_sharp, 400.0)
+        # 2.25x the pixels does not make up for a quarter of the sharpness
+        processor.update_track(1, 'Blue Jay', 0.9, bbox, 0.1, large_blurry, 100.0)
+        self.assertIs(processor.tracks[1]['best_frame'], small_sharp)
+        # At equal sharpness the larger crop wins
+        processor.update_track(1, 'Blue Jay', 0.9, bbox, 0.2, large_blurry, 400.0)
+        self.assertIs(processor.tracks[1]['best_frame'], large_blurry)
+
+    def test_invalid_frame_skipped(self):
+        strategy = CountingStrategy()
+        processor = FrameProcessor(strategy)
+        self.assertFalse(processor.run(None))
+        self.assertFalse(processor.run(np.array([])))
+        self.assertEqual(strategy.frames_seen, 0)
+
+    def test_light_decision_cached(self):
+        dark = np.zeros((64, 64, 3), dtype=np.uint8)
+
+        strategy = CountingStrategy()
+        processor = FrameProcessor(strategy)
+        self.assertFalse(processor.run(dark))
+        # Still within the TTL, so the lit frame is skipped without a new check
+        self.assertFalse(processor.run(make_frame(bird=True)))
+        self.assertEqual(strategy.frames_seen, 0)
+
+        processor = FrameProcessor(CountingStrategy(), light_ttl=0)
+        self.assertFalse(processor.run(dark))
+        self.assertTrue(processor.run(make_frame(bird=True)))
+
+    def test_batched_frames_detected_on_flush(self):
+        strategy = CountingStrategy()
+        processor = FrameProcessor(strategy, batch_size=4, batch_timeout=60)
+        for _ in range(3):
+            self.assertFalse(processor.run(make_frame(bird=True)))
+        self.assertEqual(strategy.frames_seen, 0)
+        self.assertTrue(processor.flush())
+        self.assertEqual(strategy.frames_seen, 3)
+        self.assertEqual(len(processor.tracks[1]['frames']), 3)
+
+    def test_pipelined_matches_run(self):
+        frames = [make_frame(bird=i % 3 != 0) for i in range(10)]
+
+        sync = FrameProcessor(CountingStrategy())
+        for frame in frames:
+            sync.run(frame)
+
+        piped = FrameProcessor(CountingStrategy(), pipelined=True)
+        for frame in frames:
+            piped.submit(frame)
+        piped.flush()
+
+        self.assertEqual(piped.tracks[1]['preds'], sync.tracks[1]['preds'])
+        self.assertEqual(len(piped.tracks[1]['frames']), len(sync.tracks[1]['frames']))
+        self.assertEqual(piped.strategy.frames_seen, len(frames))
+
+    def test_pipelined_detection_error_skips_batch(self):
+        class FailingOnceStrategy(CountingStrategy):
+            def detect(self, frame, tracker_config, min_confidence):
+                if self.frames_seen == 0:
+                    self.frames_seen += 1
+                    raise RuntimeError('detector failed')
+                return super().detect(frame, tracker_config, min_confidence)
+
+        processor = FrameProcessor(FailingOnceStrategy(), pipelined=True)
+        for _ in range(3):
+            processor.submit(make_frame(bird=True))
+        self.assertTrue(processor.flush())
+        # The failed frame is dropped, the later ones are still tracked
+        self.assertEqual(len(processor.tracks[1]['frames']), 2)
+
+    def test_pipelined_worker_error_skips_frame(self):
+        processor = FrameProcessor(CountingStrategy(), pipelined=True)
+
+        def broken_light_check(img):
+            raise RuntimeError('light check failed')
+        processor._has_light = broken_light_check
+
+        processor.submit(make_frame(bird=True))
+        self.assertFalse(processor.flush())
+
+        # The worker survives and keeps detecting
+        del processor._has_light
+        processor.submit(make_frame(bird=True))
+        self.assertTrue(processor.flush())
+
+
+class TestFrameLog(unittest.TestCase):
+
+    def test_matches_dict_per_frame(self):
+        rng = np.random.default_rng(0)
+        log = FrameLog(capacity=4)
+        expected = []
+        for i in range(50):  # grows past the initial capacity several times
+            t = round(i * 0.033, 2)
+            bbox = rng.random(4).astype(np.float32)
+            log.append(t, bbox)
+            expected.append({'t': t, 'bbox': [round(float(b), 2) for b in bbox]})
+        self.assertEqual(len(log), 50)
+        self.assertEqual(list(log), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -9,6 +9,47 @@ import numpy as np
 from unittest.mock import Mock, patch, MagicMock
 
 
+def resize_to_tensor(size):
+    """Toy transform: PIL image -> (3, size, size) float tensor in [0, 1]."""
+    def transform(im):
+        import torch
+        return torch.from_numpy(np.asarray(im.resize((size, size)), dtype=np.float32).transpose(2, 0, 1) / 255.0)
+    return transform
+
+
+@pytest.fixture
+def make_classifier():
+    """Factory for an INatClassifier built by __init__ around a toy network instead of a Birder model."""
+    from inat_classifier import INatClassifier
+
+    def make(net, class_names, size=32, transform=None, **kwargs):
+        model_info = Mock()
+        model_info.signature = "toy"
+        model_info.rgb_stats = {}
+        model_info.class_to_idx = {name: i for i, name in enumerate(class_names)}
+        with patch('inat_classifier.BIRDER_AVAILABLE', True), \
+             patch('inat_classifier.birder', create=True) as mock_birder:
+            mock_birder.load_pretrained_model.return_value = (net, model_info)
+            mock_birder.get_size_from_signature.return_value = size
+            mock_birder.classification_transform.return_value = transform or resize_to_tensor(size)
+            return INatClassifier(model_name="toy", **kwargs)
+
+    return make
+
+
+def constant_logits(torch, logits):
+    """Toy network returning the same logits for every crop."""
+    class ConstantLogits(torch.nn.Module):
+        def __init__(self):
+            super().__init__()
+            self.logits = torch.nn.Parameter(torch.tensor(logits), requires_grad=False)
+
+        def forward(self, x):
+            return self.logits.expand(len(x), -1)
+
+    return ConstantLogits().eval()
+
+
 class TestINatClassifier:
     """Tests for INatClassifier class."""
     
@@ -104,6 +145,81 @@ class TestINatClassifier:
             assert classifier._is_bird_class("Mammalia_Sciurus") == False
             assert classifier._is_bird_class("Insecta_Apis") == False
 
+    def test_bird_and_regional_filters(self, make_classifier):
+        """Test that classify() prefers birds, then regional species, among the top predictions."""
+        torch = pytest.importorskip("torch")
+        names = ["Mammalia_Sciurus_niger", "Aves_Cacatua_galerita", "Aves_Corvus_corax"]
+        net = constant_logits(torch, [3.0, 1.0, 2.0])
+        crop = np.zeros((40, 50, 3), dtype=np.uint8)
+
+        name, _, meta = make_classifier(net, names).classify(crop)
+        assert name == "Corvus corax"
+        assert [p["scientific_name"] for p in meta["top_predictions"]] == ["Aves_Corvus_corax", "Aves_Cacatua_galerita"]
+
+        name, conf, meta = make_classifier(net, names, regional_species=["cacatua"]).classify(crop)
+        assert name == "Cacatua galerita"
+        assert meta["scientific_name"] == "Aves_Cacatua_galerita"
+        assert conf == pytest.approx(np.exp(1.0) / np.exp([3.0, 1.0, 2.0]).sum())
+
+        name, _, _ = make_classifier(net, names, bird_only=False).classify(crop)
+        assert name == "Sciurus niger"
+
+    def test_invalid_precision(self):
+        """Test that an unsupported precision is rejected before loading the model."""
+        with patch('inat_classifier.BIRDER_AVAILABLE', True):
+            from inat_classifier import INatClassifier
+            with pytest.raises(ValueError):
+                INatClassifier(precision="int4")
+
+    def test_tensor_preprocess_matches_pil(self, make_classifier):
+        """Test that a v2 transform run on uint8 tensors classifies like the same transform on PIL images."""
+        torch = pytest.importorskip("torch")
+        v2 = pytest.importorskip("torchvision.transforms.v2")
+
+        # Same steps as Birder's inference preset
+        transform = v2.Compose([
+            v2.Resize((64, 64), interpolation=v2.InterpolationMode.BICUBIC, antialias=True),
+            v2.CenterCrop((64, 64)),
+            v2.PILToTensor(),
+            v2.ToDtype(torch.float32, scale=True),
+            v2.Normalize(mean=[0.5, 0.5, 0.5], std=[0.25, 0.25, 0.25]),
+        ])
+        torch.manual_seed(0)
+        net = torch.nn.Sequential(torch.nn.Flatten(), torch.nn.Linear(3 * 64 * 64, 10)).eval()
+        names = [f"Aves_species_{i}" for i in range(10)]
+        tensor_classifier = make_classifier(net, names, size=64, transform=transform)
+        # A plain callable is not a v2 pipeline, so it only ever sees PIL images
+        pil_classifier = make_classifier(net, names, size=64, transform=lambda im: transform(im))
+
+        crop = np.random.default_rng(0).integers(0, 256, (90, 120, 3), dtype=np.uint8)
+        tensor_name, tensor_conf, _ = tensor_classifier.classify(crop)
+        pil_name, pil_conf, _ = pil_classifier.classify(crop)
+        assert tensor_name == pil_name
+        # Resize rounding may differ by one uint8 level
+        assert tensor_conf == pytest.approx(pil_conf, abs=0.01)
+
+    def test_classify_batch_matches_classify(self, make_classifier):
+        """Test that a batched forward gives the same result as one crop at a time."""
+        torch = pytest.importorskip("torch")
+
+        torch.manual_seed(0)
+        classifier = make_classifier(
+            torch.nn.Sequential(torch.nn.Flatten(), torch.nn.Linear(3 * 32 * 32, 10)).eval(),
+            [f"Aves_species_{i}" for i in range(10)])
+
+        rng = np.random.default_rng(0)
+        crops = [rng.integers(0, 256, (40, 50, 3), dtype=np.uint8) for _ in range(3)]
+        crops.insert(1, np.zeros((0, 0, 3), dtype=np.uint8))
+
+        batched = classifier.classify_batch(crops)
+        assert batched[1] == (None, 0.0, {})
+        for crop, (name, conf, meta) in zip(crops, batched):
+            if crop.size == 0:
+                continue
+            single_name, single_conf, _ = classifier.classify(crop)
+            assert name == single_name
+            assert conf == pytest.approx(single_conf, abs=1e-5)
+
 
 class TestCreateINatClassifier:
     """Tests for the factory function."""